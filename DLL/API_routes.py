@@ -1,27 +1,210 @@
+import asyncio
 import logging
 import os
-import re
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, HTTPException, Path, Request
-from auth.dependencies import fetch_channel_data, fetch_urls, get_current_user, get_db
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from auth.dependencies import get_current_user
 import httpx
-import json
 from redis.asyncio import Redis
 from logger import log_error, log_info
-from DLL.utils import RateLimitConfig, RateLimiter
-from users.models import APIRoute, StatusEnum
+from DLL.cache_codec import accepts_encoding, resolve_codec
+from DLL.config_snapshot import config_store
+from DLL.http_clients import StreamedUpstream, fetch_upstream, upstream_clients
+from DLL.hot_keys import hot_keys
+from DLL.local_cache import local_cache
+from DLL.route_matcher import RouteMatch
+from DLL.response_cache import CacheEntry, ResponseCache, cache_indexes, cache_key as build_cache_key
+from DLL.singleflight import RedisSingleFlight, SingleFlight
+from DLL.utils import HybridRateLimiter, RateLimitConfig, RateLimiter
 
 router = APIRouter()
 redis_url = os.getenv("REDIS_URL")
 redis_client = Redis.from_url(redis_url, decode_responses=True)
+# Cached bodies are raw upstream bytes, so the cache gets its own undecoded client
+cache_redis_client = Redis.from_url(redis_url)
 
-config = RateLimitConfig(max_calls=60, period=60)
-rate_limiter = RateLimiter(redis_client, config)
+# Defaults for channels without their own quota; "sliding_window" or "token_bucket"
+config = RateLimitConfig(
+    max_calls=int(os.getenv("RATE_LIMIT_CALLS", 60)),
+    period=int(os.getenv("RATE_LIMIT_PERIOD", 60)),
+    algorithm=os.getenv("RATE_LIMIT_ALGORITHM", "sliding_window").lower(),
+)
+# "redis" checks every request in Redis, "hybrid" spends locally leased batches of the quota
+if os.getenv("RATE_LIMIT_MODE", "redis").lower() == "hybrid":
+    rate_limiter = HybridRateLimiter(redis_client, config, lease_fraction=float(os.getenv("RATE_LIMIT_LEASE_FRACTION", 0.1)))
+else:
+    rate_limiter = RateLimiter(redis_client, config)
+# LOCAL_CACHE=off keeps every lookup in Redis
+response_cache = ResponseCache(
+    cache_redis_client, local_cache if os.getenv("LOCAL_CACHE", "on").lower() != "off" else None
+)
+
+# "local" coalesces misses per worker, "redis" also coalesces across workers
+if os.getenv("CACHE_SINGLEFLIGHT", "local").lower() == "redis":
+    single_flight = RedisSingleFlight(redis_client)
+else:
+    single_flight = SingleFlight()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def is_upstream_failure(exc: Exception) -> bool:
+    """5xx answers, timeouts and connection errors from the core API."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == bare for candidate in if_none_match.split(","))
+
+
+def is_not_modified(request: Request, entry: CacheEntry) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, entry.client_etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and entry.last_modified:
+        try:
+            return parsedate_to_datetime(entry.last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def cached_response(request: Request, response: Response, entry: CacheEntry, cache_state: str):
+    """Upstream bytes as-is, or a bare 304 when the client already holds this version.
+
+    Compressed entries are sent still compressed when Accept-Encoding allows
+    it, under a weak ETag since the bytes differ from the identity form.
+    """
+    encoded = entry.encoding is not None and accepts_encoding(request.headers.get("accept-encoding"), entry.encoding)
+    etag = entry.client_etag
+    if encoded and not etag.startswith("W/"):
+        etag = "W/" + etag
+    response.headers["ETag"] = etag
+    if entry.encoding is not None:
+        response.headers["Vary"] = "Accept-Encoding"
+    if entry.last_modified:
+        response.headers["Last-Modified"] = entry.last_modified
+    response.headers["X-Cache"] = cache_state
+    # A returned Response replaces the injected one, so carry its headers (rate limits) over
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    if is_not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    if encoded:
+        headers["Content-Encoding"] = entry.encoding
+        return Response(content=entry.body, media_type=entry.content_type, headers=headers)
+    return Response(content=entry.decoded(), media_type=entry.content_type, headers=headers)
+
+
+# Upstream headers worth keeping on a streamed download
+STREAMED_HEADERS = ("content-length", "content-disposition", "etag", "last-modified")
+
+
+def streamed_response(response: Response, upstream: StreamedUpstream) -> StreamingResponse:
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    for name in STREAMED_HEADERS:
+        # httpx decodes content-encoding, which makes the upstream length wrong
+        if name == "content-length" and "content-encoding" in upstream.response.headers:
+            continue
+        if name in upstream.response.headers:
+            headers[name] = upstream.response.headers[name]
+    headers["X-Cache"] = "BYPASS"
+    return StreamingResponse(
+        upstream.body(),
+        media_type=upstream.response.headers.get("content-type", "application/octet-stream"),
+        headers=headers,
+        # The body's own cleanup never runs when the client leaves before the first chunk
+        background=BackgroundTask(upstream.aclose),
+    )
+
+
+_revalidating: set = set()
+_background_tasks: set = set()
+
+
+def revalidate_in_background(cache_key: str, fetch):
+    if cache_key in _revalidating:
+        return
+    _revalidating.add(cache_key)
+
+    async def refresh():
+        try:
+            fetched = await single_flight.do(cache_key, fetch, load=lambda: response_cache.peek(cache_key))
+            if isinstance(fetched, StreamedUpstream) and fetched.claim():
+                await fetched.aclose()
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {cache_key}: {e}")
+        finally:
+            _revalidating.discard(cache_key)
+
+    task = asyncio.create_task(refresh())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def rate_limit_quotas(channel_data: dict, route: dict, user_id) -> list:
+    """Per user+channel quota, plus a per user+route quota when the route defines one."""
+    channel_quota = RateLimitConfig(
+        channel_data.get("RateLimitCalls") or config.max_calls,
+        channel_data.get("RateLimitPeriod") or config.period,
+    )
+    quotas = [(f"rate_limit:{channel_data['name']}:{user_id}", channel_quota)]
+    if route.get("rate_limit_calls") and route.get("rate_limit_period"):
+        route_quota = RateLimitConfig(route["rate_limit_calls"], route["rate_limit_period"])
+        quotas.append((f"rate_limit:{channel_data['name']}:route:{route['id']}:{user_id}", route_quota))
+    return quotas
+
+
+async def fetch_into_cache(channel_data: dict, matched: RouteMatch, path: str, entry: Optional[CacheEntry] = None):
+    """Fetch ``path`` from the core API and store it; revalidates ``entry`` when given.
+
+    Returns the stored CacheEntry, or a StreamedUpstream for bodies too large to cache.
+    """
+    channel = channel_data["name"]
+    core_api_url = f"{channel_data.get('BaseUrl')}/{channel}{path}"
+    cache_key = build_cache_key(channel, matched.cache_key_prefix, path)
+    ttl = matched.maxcache
+    keep_for = max(matched.stale_ttl, matched.stale_if_error_ttl)
+
+    headers = {"Authorization": channel_data.get("ApiKey")}
+    if entry is not None:
+        # Revalidate what we hold instead of downloading it again
+        headers.update(entry.validators())
+    client = await upstream_clients.acquire(channel_data)
+    try:
+        upstream, body = await fetch_upstream(client, core_api_url, headers, upstream_clients.timeout_for(channel_data))
+    except BaseException:
+        await upstream_clients.release(client)
+        raise
+    if isinstance(body, StreamedUpstream):
+        # The stream keeps using the client until it is closed
+        body.on_close = lambda: upstream_clients.release(client)
+    else:
+        await upstream_clients.release(client)
+    if upstream.status_code == 304 and entry is not None:
+        return await response_cache.refresh(cache_key, entry, ttl, keep_for)
+    upstream.raise_for_status()
+    if isinstance(body, StreamedUpstream):
+        # Too large to hold in memory, so it is not cached either
+        return body
+    return await response_cache.set(
+        cache_key, body, upstream.headers.get("content-type", "application/json"), ttl, keep_for,
+        etag=upstream.headers.get("etag"), last_modified=upstream.headers.get("last-modified"),
+        codec=resolve_codec(matched.cache_codec),
+        indexes=cache_indexes(channel, matched.cache_key_prefix, path),
+    )
+
+
 # DYNAMIC_PATHS_FROM_DB = [
 #     "/clients",
 #     "/clients/{client_id}",
@@ -43,10 +226,10 @@ logger = logging.getLogger(__name__)
 @router.get("/{full_path:path}")
 async def handle_dynamic_routes(
     request: Request,
+    response: Response,
     channel: str = Path(..., description="Service prefix from URL"),
     full_path: str = Path(..., description="Dynamic subpath"),
-    token_data: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    token_data: dict = Depends(get_current_user)
 ):
     request_path = "/" + full_path
 
@@ -58,18 +241,15 @@ async def handle_dynamic_routes(
     token = request.headers.get("Authorization", "none")
     
     user_channel = getattr(token_data, "channels", None)
-    channel_data = fetch_channel_data(channel, db)
-    urls_patterns = fetch_urls(db)    
-    print("displaye url patterns", urls_patterns)
+    # Channels and routes come from the in-memory snapshot, no DB round trip
+    snapshot = config_store.current
+    channel_data = snapshot.channels.get(channel)
     if not channel_data:
         log_error(client_ip, host, "/product ids - calendar - user channel", token, f"Channel '{channel}' not found in the database")
         raise HTTPException(
         status_code=404, detail=f"Channel '{channel}' not found in the database"
     ) 
     channelName = channel_data.get("name")
-    channelBaseURL = channel_data.get("BaseUrl")
-    channelApiKey = channel_data.get("ApiKey")
-    channelAuthURL = channel_data.get("AuthUrl")
        
     if not user_channel:
         log_error(client_ip, host, "/product ids - user channel", token, "User's channel is not defined")
@@ -91,43 +271,60 @@ async def handle_dynamic_routes(
         log_error(client_ip, host, "/product ids - user channel", token, f"Invalid or unsupported API prefix - parameter value:'{channel}', required prefix: '{channelName}' in the paramters..")
         raise HTTPException(status_code=400, detail=f"Invalid or unsupported API prefix - parameter value:'{channel}', required prefix: '{channelName}' in the paramters..")        
     
-    core_api_url = f"{channelBaseURL}/{channelName}/{full_path}"
-    api_key = channelApiKey
-    
-    print("core url to get data", core_api_url)
     # Validate if this path is allowed
-    dynamic_paths = get_dynamic_paths_from_db(db)
-    
-    if not is_valid_dynamic_path(request_path, dynamic_paths):
+    matched = snapshot.matcher.match(request_path)
+    if matched is None:
         raise HTTPException(status_code=404, detail="Invalid path")
-    
-    if is_valid_dynamic_path(request_path, dynamic_paths):
-        try:
-            matching = next((p for p in dynamic_paths if re.match("^" + re.sub(r"\{[^}]+\}", r"[^/]+", p["path"]) + "$", request_path)), None)
-            ttl = matching["maxcache"] if matching else 5
-            print("show ttl value", ttl)
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": api_key}
-                response = await client.get(core_api_url, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-
-            cache_key = f"{channel}:{request_path}"
-            
-            await redis_client.set(cache_key, json.dumps(data), ex=ttl)
-
-            logger.info("Data fetched from core API and cached in Redis.")
-            client_ip = request.client.host
-            log_info(client_ip, request.headers.get("host"), request_path, "", "Data fetched from core API.")
-            return data
-        
-        except httpx.HTTPStatusError as exc:
+    hot_keys.record(channel, request_path)
+
+    # One atomic Redis call covers every quota that applies to this request
+    limit = await rate_limiter.hit(rate_limit_quotas(channel_data, matched.route, token_data.id))
+    if limit is not None:
+        if not limit.allowed:
+            log_error(client_ip, host, request_path, token, f"Rate limit exceeded, retry after {limit.retry_after:.2f}s")
+            raise HTTPException(status_code=429, detail="Rate limit exceeded", headers=limit.headers())
+        response.headers.update(limit.headers())
+
+    cache_key = build_cache_key(channel, matched.cache_key_prefix, request_path)
+    entry = await response_cache.get(cache_key, max_ttl=matched.maxcache)
+
+    async def fetch_from_core():
+        return await fetch_into_cache(channel_data, matched, request_path, entry)
+
+    if entry is not None:
+        if entry.is_fresh():
+            log_info(client_ip, host, request_path, "", "Data served from cache.")
+            return cached_response(request, response, entry, "HIT")
+        if entry.within(matched.stale_ttl):
+            # Stale-while-revalidate: answer now, refresh once in the background
+            revalidate_in_background(cache_key, fetch_from_core)
+            response_cache.stale_hits += 1
+            log_info(client_ip, host, request_path, "", "Stale data served from cache while revalidating.")
+            return cached_response(request, response, entry, "STALE")
+
+    try:
+        fetched = await single_flight.do(cache_key, fetch_from_core, load=lambda: response_cache.peek(cache_key))
+        if isinstance(fetched, StreamedUpstream) and not fetched.claim():
+            # Another request led the fetch and owns that stream; open our own
+            fetched = await fetch_from_core()
+            if isinstance(fetched, StreamedUpstream):
+                fetched.claim()
+    except Exception as exc:
+        if is_upstream_failure(exc) and entry is not None and entry.within(matched.stale_if_error_ttl):
+            response_cache.stale_errors += 1
+            log_error(client_ip, host, request_path, token, f"Core API failed, serving stale data: {exc}")
+            return cached_response(request, response, entry, "STALE")
+        if isinstance(exc, httpx.HTTPStatusError):
             raise HTTPException(status_code=exc.response.status_code, detail=exc.response.text)
-        except Exception as e:
-            logger.error(f"Error fetching from core API: {e}")
-            raise HTTPException(status_code=500, detail="Internal server error")
-    else:
-        raise HTTPException(status_code=404, detail="Invalid path")
+        logger.error(f"Error fetching from core API: {exc}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    if isinstance(fetched, StreamedUpstream):
+        log_info(client_ip, host, request_path, "", "Large response streamed from core API.")
+        return streamed_response(response, fetched)
+
+    log_info(client_ip, host, request_path, "", "Data fetched from core API.")
+    return cached_response(request, response, fetched, "MISS")
 
 # Dynamic Path Matcher
 # def is_valid_dynamic_path(path: str) -> bool:
@@ -136,16 +333,3 @@ async def handle_dynamic_routes(
 #         if re.match(regex, path):
 #             return True
 #     return False
-
-def get_dynamic_paths_from_db(db: Session) -> list[dict]:
-    """Fetch all active paths and their maxcache from DB."""
-    results = db.query(APIRoute).filter(APIRoute.status == StatusEnum.active).all()
-    return [{"path": route.path, "maxcache": route.maxcache} for route in results]
-
-def is_valid_dynamic_path(path: str, paths_from_db: list[dict]) -> bool:
-    for entry in paths_from_db:
-        template = entry["path"]
-        regex = "^" + re.sub(r"\{[^}]+\}", r"[^/]+", template) + "$"
-        if re.match(regex, path):
-            return True
-    return False
@@ -0,0 +1,66 @@
+import gzip
+import os
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # Optional, gzip is used when it is not installed
+    zstandard = None
+
+CODECS = ("zstd", "gzip", "none")
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", 1024))
+CACHE_CODEC = os.getenv("CACHE_CODEC", "zstd" if zstandard is not None else "gzip").lower()
+GZIP_LEVEL = int(os.getenv("CACHE_GZIP_LEVEL", 6))
+ZSTD_LEVEL = int(os.getenv("CACHE_ZSTD_LEVEL", 3))
+
+
+def resolve_codec(route_codec: Optional[str]) -> Optional[str]:
+    """Codec for a route: its own ``cache_codec`` or CACHE_CODEC; zstd falls back to gzip."""
+    codec = (route_codec or CACHE_CODEC).lower()
+    if codec == "zstd" and zstandard is None:
+        codec = "gzip"
+    return codec if codec in ("zstd", "gzip") else None
+
+
+def compress(body: bytes, codec: Optional[str], min_bytes: int = CACHE_COMPRESS_MIN_BYTES):
+    """Return ``(stored bytes, encoding)``; small bodies and incompressible ones stay as they are."""
+    if codec is None or len(body) < min_bytes:
+        return body, None
+    if codec == "zstd":
+        packed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    else:
+        packed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if len(packed) >= len(body):
+        return body, None
+    return packed, codec
+
+
+def decompress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding is None:
+        return body
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompress(body)
+    return gzip.decompress(body)
+
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows ``encoding`` (q=0 refuses it)."""
+    if not accept_encoding:
+        return False
+    wildcard = False
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name == encoding:
+            return quality > 0
+        if name == "*":
+            wildcard = quality > 0
+    return wildcard
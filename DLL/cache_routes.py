@@ -0,0 +1,97 @@
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from auth.middleware import admin_only
+from DLL.API_routes import response_cache, single_flight
+from DLL.cache_warmer import cache_warmer
+from DLL.config_snapshot import config_store
+from DLL.response_cache import cache_key, channel_index, path_index, prefix_index, split_cache_key
+from DLL.route_matcher import RouteMatcher
+from DLL.schemas import CachePurgeRequest
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Hit/miss counters of the upstream response cache (per worker)
+@router.get("/stats", dependencies=[Depends(admin_only)])
+async def get_cache_stats():
+    return {
+        "message": "Cache statistics retrieved successfully",
+        "result": True,
+        "data": {
+            **response_cache.stats(),
+            "inflight_fetches": single_flight.inflight(),
+            "last_warm_run": cache_warmer.last_run,
+        }
+    }
+
+
+async def keys_for_path(channel: str, path: str, prefix: Optional[str]) -> List[str]:
+    segments = [segment for segment in path.split("/") if segment]
+    if segments and segments[-1] == "*":
+        # Everything below a path, e.g. /clients/42/*
+        base = segments[:-1]
+        index = path_index(channel, "/" + "/".join(base)) if base else channel_index(channel)
+        keys = await response_cache.indexed_keys([index])
+    elif any(segment.startswith("{") for segment in segments):
+        # A template: read the index of its literal head, keep the keys the template matches
+        literal = []
+        for segment in segments:
+            if segment.startswith("{"):
+                break
+            literal.append(segment)
+        index = path_index(channel, "/" + "/".join(literal)) if literal else channel_index(channel)
+        template = RouteMatcher([{"path": path, "maxcache": 0}])
+        keys = [key for key in await response_cache.indexed_keys([index])
+                if template.match(split_cache_key(key)[2]) is not None]
+    else:
+        matched = config_store.current.matcher.match(path)
+        if matched is None:
+            return []
+        keys = [cache_key(channel, matched.cache_key_prefix, path)]
+    if prefix:
+        keys = [key for key in keys if split_cache_key(key)[1] == prefix]
+    return keys
+
+
+# Purge cached upstream responses through the key indexes, never KEYS/SCAN
+@router.post("/purge", dependencies=[Depends(admin_only)])
+async def purge_cache(purge: CachePurgeRequest):
+    if not (purge.channel or purge.cache_key_prefix or purge.path):
+        raise HTTPException(status_code=400, detail="Give a channel, a cache_key_prefix or a path to purge")
+    if purge.channel and purge.channel not in config_store.current.channels:
+        raise HTTPException(status_code=404, detail=f"Channel '{purge.channel}' not found")
+    channels = [purge.channel] if purge.channel else list(config_store.current.channels.keys())
+
+    try:
+        if purge.path:
+            keys = []
+            for channel in channels:
+                keys.extend(await keys_for_path(channel, purge.path, purge.cache_key_prefix))
+        elif purge.cache_key_prefix:
+            keys = await response_cache.indexed_keys([prefix_index(purge.cache_key_prefix, purge.channel)])
+        else:
+            keys = await response_cache.indexed_keys([channel_index(purge.channel)])
+        purged = await response_cache.purge(keys)
+    except Exception:
+        logger.exception("Cache purge failed")
+        raise HTTPException(status_code=500, detail="Cache purge failed")
+
+    return {
+        "message": "Cache purged successfully",
+        "result": True,
+        "data": {"purged": purged, "matched_keys": len(keys)}
+    }
+
+
+# Run the cache warmer now instead of waiting for its schedule
+@router.post("/warm", dependencies=[Depends(admin_only)])
+async def warm_cache():
+    summary = await cache_warmer.run_once(min_interval=0)
+    if summary is None:
+        raise HTTPException(status_code=409, detail="Cache warming is already running")
+    return {
+        "message": "Cache warmed successfully",
+        "result": True,
+        "data": summary
+    }
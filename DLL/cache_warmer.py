@@ -0,0 +1,224 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote
+from DLL.API_routes import fetch_into_cache, rate_limiter, redis_client, response_cache, single_flight
+from DLL.config_snapshot import ConfigSnapshot, config_store
+from DLL.hot_keys import hot_keys
+from DLL.http_clients import StreamedUpstream
+from DLL.response_cache import cache_key
+from DLL.singleflight import RELEASE_LOCK_SCRIPT
+from DLL.utils import RateLimitConfig
+
+logger = logging.getLogger(__name__)
+
+CACHE_WARM_INTERVAL = int(os.getenv("CACHE_WARM_INTERVAL", 900))
+# Upper bound on one run; the lock is released as soon as the run ends
+CACHE_WARM_LOCK_TTL = int(os.getenv("CACHE_WARM_LOCK_TTL", 600))
+CACHE_WARM_STARTUP_DELAY = float(os.getenv("CACHE_WARM_STARTUP_DELAY", 5))
+CACHE_WARM_CONCURRENCY = int(os.getenv("CACHE_WARM_CONCURRENCY", 4))
+CACHE_WARM_MAX_KEYS = int(os.getenv("CACHE_WARM_MAX_KEYS", 200))
+# Share of CACHE_WARM_MAX_KEYS kept for the paths filled in from list routes
+CACHE_WARM_CHILD_SHARE = float(os.getenv("CACHE_WARM_CHILD_SHARE", 0.5))
+CACHE_WARM_RATE_CALLS = int(os.getenv("CACHE_WARM_RATE_CALLS", 60))
+CACHE_WARM_RATE_PERIOD = int(os.getenv("CACHE_WARM_RATE_PERIOD", 60))
+# Fields tried, in order, to read ids out of the items of a parent list such as /clients
+CACHE_WARM_ID_FIELDS = [field.strip() for field in os.getenv("CACHE_WARM_ID_FIELDS", "id,client_id,clientId").split(",")]
+LIST_ENVELOPES = ("data", "items", "results")
+WARM_LOCK_KEY = "cachewarmer:lock"
+# Present while the last run, on any worker, is more recent than the interval
+WARM_LAST_RUN_KEY = "cachewarmer:lastrun"
+
+
+def _segments(path: str) -> List[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+def _is_param(segment: str) -> bool:
+    return segment.startswith("{") and segment.endswith("}")
+
+
+def extract_ids(payload, fields: Iterable[str] = CACHE_WARM_ID_FIELDS) -> List[str]:
+    """Ids of the items in a list payload, bare or wrapped in data/items/results."""
+    items = payload
+    if isinstance(payload, dict):
+        items = next((payload[name] for name in LIST_ENVELOPES if isinstance(payload.get(name), list)), None)
+    if not isinstance(items, list):
+        return []
+    ids = []
+    for item in items:
+        if isinstance(item, dict):
+            value = next((item[field] for field in fields if item.get(field) is not None), None)
+        else:
+            value = item if isinstance(item, (str, int)) else None
+        if value is not None:
+            ids.append(str(value))
+    return ids
+
+
+def child_templates(routes: Iterable[dict]) -> Dict[str, List[str]]:
+    """Map each static list route to the templates with a single parameter right below it.
+
+    ``/clients`` maps to ``/clients/{client_id}``, ``/clients/{client_id}/products``
+    and so on; templates with a second parameter can't be filled from that list.
+    """
+    templates: Dict[str, List[str]] = {}
+    static_paths = {route["path"] for route in routes
+                    if route.get("method", "GET").upper() == "GET"
+                    and not any(_is_param(segment) for segment in _segments(route["path"]))}
+    for route in routes:
+        if route.get("method", "GET").upper() != "GET":
+            continue
+        segments = _segments(route["path"])
+        params = [index for index, segment in enumerate(segments) if _is_param(segment)]
+        if len(params) != 1:
+            continue
+        parent = "/" + "/".join(segments[:params[0]])
+        if parent in static_paths:
+            templates.setdefault(parent, []).append(route["path"])
+    return templates
+
+
+class CacheWarmer:
+    """Prefetches the response cache after deploys and Redis flushes.
+
+    Each run warms, per channel, the static list routes and then the most
+    requested paths from the hot key statistics. It then reads those lists
+    (e.g. ``/clients``) to fill in the templates below them
+    (``/clients/{id}/products``), with ``child_share`` of ``max_keys`` kept
+    for them so hot paths can't use up the whole budget.
+    Fetches per channel are bounded by ``concurrency`` and by a rate limit quota of
+    their own, and only one worker warms at a time.
+    """
+
+    def __init__(self, concurrency: int = CACHE_WARM_CONCURRENCY, max_keys: int = CACHE_WARM_MAX_KEYS,
+                 quota: Optional[RateLimitConfig] = None, child_share: float = CACHE_WARM_CHILD_SHARE):
+        self.concurrency = concurrency
+        self.max_keys = max_keys
+        self.child_share = child_share
+        self.quota = quota or RateLimitConfig(CACHE_WARM_RATE_CALLS, CACHE_WARM_RATE_PERIOD)
+        self.last_run: Optional[dict] = None
+        self._release = redis_client.register_script(RELEASE_LOCK_SCRIPT)
+
+    async def run_once(self, min_interval: int = CACHE_WARM_INTERVAL) -> Optional[dict]:
+        """Warm every channel unless a run is in progress or, with ``min_interval``, ran that recently."""
+        token = uuid.uuid4().hex
+        try:
+            if not await redis_client.set(WARM_LOCK_KEY, token, nx=True, ex=CACHE_WARM_LOCK_TTL):
+                return None
+        except Exception as e:
+            logger.warning(f"Cache warmer lock unavailable, skipping run: {e}")
+            return None
+        try:
+            if min_interval > 0 and await redis_client.exists(WARM_LAST_RUN_KEY):
+                return None
+            await redis_client.set(WARM_LAST_RUN_KEY, token, ex=max(1, min_interval or CACHE_WARM_INTERVAL))
+            return await self._run()
+        finally:
+            try:
+                await self._release(keys=[WARM_LOCK_KEY], args=[token])
+            except Exception as e:
+                logger.warning(f"Cache warmer lock release failed: {e}")
+
+    async def _run(self) -> dict:
+        snapshot = config_store.current
+        results = await asyncio.gather(
+            *(self.warm_channel(channel_data, snapshot) for channel_data in snapshot.channels.values()
+              if channel_data.get("BaseUrl")),
+            return_exceptions=True,
+        )
+        summary = {"warmed": 0, "fresh": 0, "failed": 0}
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Cache warming failed for a channel: {result}")
+                continue
+            for name in summary:
+                summary[name] += result[name]
+        self.last_run = summary
+        logger.info(f"Cache warming done: {summary}")
+        return summary
+
+    async def warm_channel(self, channel_data: dict, snapshot: ConfigSnapshot) -> dict:
+        channel = channel_data["name"]
+        counts = {"warmed": 0, "fresh": 0, "failed": 0}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        seen = set()
+
+        async def warm_all(paths: Iterable[str], budget: int) -> Dict[str, object]:
+            paths = [path for path in paths if path not in seen][:max(0, budget - len(seen))]
+            seen.update(paths)
+
+            async def warm(path: str):
+                async with semaphore:
+                    return path, await self.warm_path(channel_data, snapshot, path, counts)
+
+            return dict(await asyncio.gather(*(warm(path) for path in paths)))
+
+        hot = [path for path, _ in await hot_keys.top(redis_client, channel, self.max_keys)]
+        await hot_keys.decay(redis_client, channel)
+        templates = child_templates(snapshot.routes)
+        reserved = int(self.max_keys * self.child_share) if templates else 0
+        lists = await warm_all(sorted(templates) + hot, self.max_keys - reserved)
+
+        children = []
+        for parent, entry in lists.items():
+            if entry is None or parent not in templates:
+                continue
+            try:
+                ids = extract_ids(json.loads(entry.decoded()))
+            except ValueError:
+                continue
+            for template in templates[parent]:
+                name = _segments(template)[len(_segments(parent))]
+                children.extend(template.replace(name, quote(value, safe=""), 1) for value in ids)
+        await warm_all(children, self.max_keys)
+        return counts
+
+    async def warm_path(self, channel_data: dict, snapshot: ConfigSnapshot, path: str, counts: dict):
+        matched = snapshot.matcher.match(path)
+        if matched is None:
+            return None
+        key = cache_key(channel_data["name"], matched.cache_key_prefix, path)
+        entry = await response_cache.peek(key, fresh_only=False)
+        if entry is not None and entry.is_fresh():
+            counts["fresh"] += 1
+            return entry
+
+        await self._wait_for_quota(channel_data["name"])
+        try:
+            fetched = await single_flight.do(
+                key, lambda: fetch_into_cache(channel_data, matched, path, entry), load=lambda: response_cache.peek(key)
+            )
+        except Exception as e:
+            counts["failed"] += 1
+            logger.warning(f"Could not warm {channel_data['name']}{path}: {e}")
+            return None
+        if isinstance(fetched, StreamedUpstream):
+            # Too large to cache; nothing to warm
+            if fetched.claim():
+                await fetched.aclose()
+            return None
+        counts["warmed"] += 1
+        return fetched
+
+    async def _wait_for_quota(self, channel: str):
+        while True:
+            result = await rate_limiter.hit([(f"rate_limit:{channel}:cache-warmer", self.quota)])
+            if result is None or result.allowed:
+                return
+            await asyncio.sleep(result.retry_after)
+
+    async def run_periodically(self, interval: int = CACHE_WARM_INTERVAL, startup_delay: float = CACHE_WARM_STARTUP_DELAY):
+        await asyncio.sleep(startup_delay)
+        while True:
+            try:
+                await self.run_once(min_interval=interval)
+            except Exception as e:
+                logger.error(f"Cache warming run failed: {e}")
+            await asyncio.sleep(interval)
+
+
+cache_warmer = CacheWarmer()
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from auth.dependencies import get_db
+from DLL.config_snapshot import config_store
 from DLL.schemas import ChannelCreate, ChannelResponse, ChannelUpdate
 from users.models import Channel
 from sqlalchemy.exc import SQLAlchemyError
@@ -23,6 +24,7 @@ def create_channel(channel: ChannelCreate, db: Session = Depends(get_db)):
         db.add(new_channel)
         db.commit()
         db.refresh(new_channel)
+        config_store.invalidate(db)
 
         return new_channel
 
@@ -64,6 +66,7 @@ def update_channel(channel_id: int, updates: ChannelUpdate, db: Session = Depend
 
         db.commit()
         db.refresh(channel)
+        config_store.invalidate(db)
 
         return channel
 
@@ -86,6 +89,7 @@ def delete_channel(channel_id: int, db: Session = Depends(get_db)):
         # Step 2: Delete the channel
         db.delete(channel)
         db.commit()
+        config_store.invalidate(db)
 
         return {"message": "Channel deleted successfully", "result": True}
 
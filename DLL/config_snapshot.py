@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from types import MappingProxyType
+from typing import Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from auth.database import AsyncSessionLocal
+from auth.dependencies import channel_to_dict
+from DLL.http_clients import upstream_clients
+from DLL.pubsub import event_bus
+from DLL.route_matcher import RouteMatcher
+from users.models import APIRoute, Channel, StatusEnum
+
+logger = logging.getLogger(__name__)
+
+CONFIG_CHANNEL = "gateway:config"
+CONFIG_VERSION_KEY = "gateway:config:version"
+
+
+def route_to_dict(route: APIRoute) -> dict:
+    return {
+        "id": route.id,
+        "method": route.method,
+        "path": route.path,
+        "maxcache": route.maxcache,
+        "stale_ttl": route.stale_ttl or 0,
+        "stale_if_error_ttl": route.stale_if_error_ttl or 0,
+        "cache_codec": route.cache_codec,
+        "cache_key_prefix": route.cache_key_prefix,
+        "rate_limit_calls": route.rate_limit_calls,
+        "rate_limit_period": route.rate_limit_period,
+    }
+
+
+class ConfigSnapshot:
+    """Read-only view of channels and active route templates for the proxy hot path."""
+
+    def __init__(self, version: int, channels: Iterable[dict], routes: Iterable[dict]):
+        self.version = version
+        self.loaded_at = time.time()
+        self.channels = MappingProxyType({ch["name"]: MappingProxyType(ch) for ch in channels})
+        self.routes = tuple(MappingProxyType(route) for route in routes)
+        self.matcher = RouteMatcher(self.routes)
+
+
+class ConfigStore:
+    """Holds the current ConfigSnapshot and swaps it when channels or routes change.
+
+    Readers take ``config_store.current`` once per request and never see a
+    half-built snapshot: a reload builds a new one and replaces the reference.
+    Changes made on one worker bump a version in Redis and are announced on
+    CONFIG_CHANNEL so the other workers reload too.
+    """
+
+    def __init__(self):
+        self._snapshot = ConfigSnapshot(0, (), ())
+
+    @property
+    def current(self) -> ConfigSnapshot:
+        return self._snapshot
+
+    def load(self, db: Session, version: Optional[int] = None) -> ConfigSnapshot:
+        channels = [channel_to_dict(ch) for ch in db.query(Channel).all()]
+        routes = [
+            route_to_dict(route)
+            for route in db.query(APIRoute).filter(APIRoute.status == StatusEnum.active).all()
+        ]
+        return self._install(version, channels, routes)
+
+    async def reload(self, version: Optional[int] = None) -> ConfigSnapshot:
+        async with AsyncSessionLocal() as db:
+            channels = [channel_to_dict(ch) for ch in (await db.execute(select(Channel))).scalars()]
+            active_routes = await db.execute(select(APIRoute).where(APIRoute.status == StatusEnum.active))
+            routes = [route_to_dict(route) for route in active_routes.scalars()]
+        return self._install(version, channels, routes)
+
+    def _install(self, version: Optional[int], channels: list, routes: list) -> ConfigSnapshot:
+        snapshot = ConfigSnapshot(self._snapshot.version if version is None else version, channels, routes)
+        self._snapshot = snapshot
+        # Pooled clients of channels that changed or went away are closed once idle
+        upstream_clients.retain(channels)
+        logger.info(f"Config snapshot v{snapshot.version} loaded: {len(snapshot.channels)} channels, {len(snapshot.routes)} routes")
+        return snapshot
+
+    def invalidate(self, db: Session):
+        """Reload from the caller's session and tell the other workers to do the same."""
+        version = None
+        try:
+            version = int(event_bus.sync_client.incr(CONFIG_VERSION_KEY))
+        except Exception as e:
+            logger.warning(f"Could not bump config version in Redis: {e}")
+        self.load(db, version)
+        if version is not None:
+            try:
+                event_bus.publish_sync(CONFIG_CHANNEL, {"version": version})
+            except Exception as e:
+                logger.warning(f"Could not publish config change: {e}")
+
+    async def startup(self):
+        version = await self._remote_version()
+        await self.reload(version or 0)
+
+    async def on_change(self, message: dict):
+        version = int(message.get("version", 0))
+        if version > self._snapshot.version:
+            await self.reload(version)
+
+    async def refresh_periodically(self, interval: int = 300):
+        # Safety net for pub/sub messages lost while a worker was disconnected
+        while True:
+            await asyncio.sleep(interval)
+            version = await self._remote_version()
+            if version is not None and version > self._snapshot.version:
+                try:
+                    await self.reload(version)
+                except Exception as e:
+                    logger.error(f"Config snapshot refresh failed: {e}")
+
+    async def _remote_version(self) -> Optional[int]:
+        try:
+            value = await event_bus.client.get(CONFIG_VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"Could not read config version from Redis: {e}")
+            return None
+        return int(value) if value is not None else 0
+
+
+config_store = ConfigStore()
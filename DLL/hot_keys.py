@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from typing import List, Tuple
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+HOT_KEYS_PREFIX = "cachestats:hot:"
+HOT_KEYS_TRACKED = int(os.getenv("HOT_KEYS_TRACKED", 1000))
+HOT_KEYS_TTL = int(os.getenv("HOT_KEYS_TTL", 7 * 24 * 3600))
+
+
+class HotKeyStats:
+    """Per-channel request counts per path, kept in a Redis sorted set.
+
+    Requests are counted in memory and flushed in one pipeline every few
+    seconds, so the proxy path never waits on Redis for statistics. Each set
+    is trimmed to the ``max_tracked`` most requested paths, and between flushes
+    at most four times that many paths are counted.
+    """
+
+    def __init__(self, max_tracked: int = HOT_KEYS_TRACKED, ttl: int = HOT_KEYS_TTL):
+        self.max_tracked = max_tracked
+        self.ttl = ttl
+        self._counts: Counter = Counter()
+
+    def record(self, channel: str, path: str):
+        key = (channel, path)
+        # Paths with ids are unique per id; new ones are dropped once the buffer is full
+        if key in self._counts or len(self._counts) < self.max_tracked * 4:
+            self._counts[key] += 1
+
+    async def flush(self, redis_client: Redis):
+        counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+        channels = {channel for channel, _ in counts}
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for (channel, path), count in counts.items():
+                    pipe.zincrby(HOT_KEYS_PREFIX + channel, count, path)
+                for channel in channels:
+                    pipe.zremrangebyrank(HOT_KEYS_PREFIX + channel, 0, -(self.max_tracked + 1))
+                    pipe.expire(HOT_KEYS_PREFIX + channel, self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not flush hot key statistics: {e}")
+
+    async def top(self, redis_client: Redis, channel: str, limit: int) -> List[Tuple[str, float]]:
+        return await redis_client.zrevrange(HOT_KEYS_PREFIX + channel, 0, limit - 1, withscores=True)
+
+    async def decay(self, redis_client: Redis, channel: str, factor: float = 0.5):
+        # Halve the scores so yesterday's traffic gives way to today's
+        key = HOT_KEYS_PREFIX + channel
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.zunionstore(key, {key: factor})
+            # ZUNIONSTORE replaces the key and drops its TTL
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def flush_periodically(self, redis_client: Redis, interval: float = 30):
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush(redis_client)
+
+
+hot_keys = HotKeyStats()
@@ -0,0 +1,192 @@
+import logging
+import os
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple, Union
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+# Bodies larger than this are streamed to the client instead of buffered and cached
+PROXY_STREAM_THRESHOLD = int(os.getenv("PROXY_STREAM_THRESHOLD", 1024 * 1024))
+
+
+def _value(channel_data: dict, key: str, default):
+    value = channel_data.get(key)
+    return default if value is None else value
+
+
+class UpstreamClientRegistry:
+    """Long-lived httpx.AsyncClient per channel base_url.
+
+    Clients keep their connection pool, TLS sessions and DNS results between
+    proxied calls. Channels sharing a base_url share a client as long as their
+    pool settings agree; timeouts are applied per request so they can differ.
+    When a config snapshot no longer uses a client, it is closed once its
+    in-flight requests are done.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple, httpx.AsyncClient] = {}
+        self._inflight: Dict[httpx.AsyncClient, int] = {}
+        self._retired: Set[httpx.AsyncClient] = set()
+        # Pool keys of the installed snapshot; swapped as a whole so it can be set from any thread
+        self._wanted: Optional[frozenset] = None
+        self._swept: Optional[frozenset] = None
+
+    def _pool_key(self, channel_data: dict) -> Tuple:
+        return (
+            channel_data.get("BaseUrl"),
+            _value(channel_data, "MaxConnections", DEFAULT_MAX_CONNECTIONS),
+            _value(channel_data, "MaxKeepaliveConnections", DEFAULT_MAX_KEEPALIVE_CONNECTIONS),
+            _value(channel_data, "KeepaliveExpiry", DEFAULT_KEEPALIVE_EXPIRY),
+            bool(channel_data.get("Http2")),
+        )
+
+    def get(self, channel_data: dict) -> httpx.AsyncClient:
+        key = self._pool_key(channel_data)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            base_url, max_connections, max_keepalive, keepalive_expiry, http2 = key
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+                timeout=self.timeout_for(channel_data),
+                http2=http2,
+            )
+            self._clients[key] = client
+            logger.info(f"Created upstream client for {base_url} (http2={http2}, max_connections={max_connections})")
+        return client
+
+    async def acquire(self, channel_data: dict) -> httpx.AsyncClient:
+        """Client for a request; hand it back with ``release()`` once the response is closed."""
+        await self._sweep()
+        client = self.get(channel_data)
+        self._inflight[client] = self._inflight.get(client, 0) + 1
+        return client
+
+    async def release(self, client: httpx.AsyncClient):
+        count = self._inflight.get(client, 1) - 1
+        if count > 0:
+            self._inflight[client] = count
+            return
+        self._inflight.pop(client, None)
+        if client in self._retired:
+            self._retired.discard(client)
+            await self._close(client)
+
+    def retain(self, channels: Iterable[dict]):
+        """Keep only the clients these channels use; the others are retired on the next acquire()."""
+        self._wanted = frozenset(self._pool_key(channel_data) for channel_data in channels
+                                 if channel_data.get("BaseUrl"))
+
+    async def _sweep(self):
+        wanted = self._wanted
+        if wanted is None or wanted is self._swept:
+            return
+        self._swept = wanted
+        for key in [key for key in self._clients if key not in wanted]:
+            client = self._clients.pop(key)
+            logger.info(f"Retiring upstream client for {key[0]}")
+            if self._inflight.get(client):
+                self._retired.add(client)
+            else:
+                await self._close(client)
+
+    def timeout_for(self, channel_data: dict) -> httpx.Timeout:
+        read_timeout = _value(channel_data, "ReadTimeout", DEFAULT_READ_TIMEOUT)
+        return httpx.Timeout(
+            read_timeout,
+            connect=_value(channel_data, "ConnectTimeout", DEFAULT_CONNECT_TIMEOUT),
+        )
+
+    async def startup(self, channels: Iterable[dict]):
+        for channel_data in channels:
+            if channel_data.get("BaseUrl"):
+                self.get(channel_data)
+
+    async def aclose(self):
+        clients = list(self._clients.values()) + list(self._retired)
+        self._clients.clear()
+        self._retired.clear()
+        self._inflight.clear()
+        for client in clients:
+            await self._close(client)
+
+    @staticmethod
+    async def _close(client: httpx.AsyncClient):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing upstream client: {e}")
+
+
+class StreamedUpstream:
+    """Upstream response too large to buffer: the bytes read so far plus the rest of the stream.
+
+    Only one request can consume it, so whoever ``claim()``s it first sends it;
+    the upstream connection is released once ``body()`` is exhausted or closed,
+    and ``on_close`` is awaited then.
+    """
+
+    def __init__(self, response: httpx.Response, prefix: bytes, chunks: AsyncIterator[bytes]):
+        self.response = response
+        self.prefix = prefix
+        self._chunks = chunks
+        self._claimed = False
+        self.on_close: Optional[Callable[[], Awaitable[None]]] = None
+
+    def claim(self) -> bool:
+        if self._claimed:
+            return False
+        self._claimed = True
+        return True
+
+    async def body(self) -> AsyncIterator[bytes]:
+        try:
+            if self.prefix:
+                yield self.prefix
+            async for chunk in self._chunks:
+                yield chunk
+        finally:
+            await self.aclose()
+
+    async def aclose(self):
+        await self.response.aclose()
+        on_close, self.on_close = self.on_close, None
+        if on_close is not None:
+            await on_close()
+
+
+async def fetch_upstream(client: httpx.AsyncClient, url: str, headers: dict, timeout: httpx.Timeout,
+                         threshold: int = PROXY_STREAM_THRESHOLD) -> Tuple[httpx.Response, Union[bytes, StreamedUpstream]]:
+    """GET ``url`` and return the response with either its buffered body or, past ``threshold``, a stream.
+
+    Only 200 responses are streamed; anything else is read in full so callers can
+    inspect it. At most ``threshold`` bytes are held before switching to streaming.
+    """
+    response = await client.send(client.build_request("GET", url, headers=headers, timeout=timeout), stream=True)
+    try:
+        length = response.headers.get("content-length")
+        if response.status_code != 200 or (length is not None and length.isdigit() and int(length) <= threshold):
+            return response, await response.aread()
+        chunks = response.aiter_bytes()
+        buffered = bytearray()
+        async for chunk in chunks:
+            buffered += chunk
+            if len(buffered) > threshold:
+                return response, StreamedUpstream(response, bytes(buffered), chunks)
+        await response.aclose()
+        return response, bytes(buffered)
+    except BaseException:
+        await response.aclose()
+        raise
+
+
+upstream_clients = UpstreamClientRegistry()
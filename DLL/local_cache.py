@@ -0,0 +1,150 @@
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from DLL.pubsub import event_bus
+
+logger = logging.getLogger(__name__)
+
+CACHE_CHANNEL = "gateway:cache"
+LOCAL_CACHE_MAX_BYTES = int(os.getenv("LOCAL_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Entries larger than this share of the cache are never kept locally
+LOCAL_CACHE_MAX_ENTRY_RATIO = float(os.getenv("LOCAL_CACHE_MAX_ENTRY_RATIO", 0.1))
+ENTRY_OVERHEAD = 256
+
+# Identifies this worker's own broadcasts, which it has already applied
+WORKER_ID = uuid.uuid4().hex
+
+
+class FrequencySketch:
+    """Count-min sketch of recent key popularity, halved periodically so old hits fade (TinyLFU)."""
+
+    def __init__(self, width: int = 4096, depth: int = 4, sample_size: Optional[int] = None):
+        self.width = width
+        self.depth = depth
+        self.sample_size = sample_size or width * 10
+        self._rows = [[0] * width for _ in range(depth)]
+        self._seeds = [hash(("sketch", row)) for row in range(depth)]
+        self._additions = 0
+
+    def _slots(self, key: str):
+        for row, seed in enumerate(self._seeds):
+            yield row, hash((seed, key)) % self.width
+
+    def add(self, key: str):
+        for row, slot in self._slots(key):
+            if self._rows[row][slot] < 15:
+                self._rows[row][slot] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+
+    def estimate(self, key: str) -> int:
+        return min(self._rows[row][slot] for row, slot in self._slots(key))
+
+    def _age(self):
+        self._rows = [[count >> 1 for count in row] for row in self._rows]
+        self._additions //= 2
+
+
+class LocalCache:
+    """Per-worker L1 in front of the Redis cache: byte-bounded LRU with TinyLFU admission.
+
+    Entries expire with their Redis freshness, never later than ``max_ttl``
+    (the route's ``maxcache``). When the cache is full, a newcomer only
+    evicts the least recently used entry if the frequency sketch has seen it
+    more often, so one-off requests can't flush the hot client lists.
+    """
+
+    def __init__(self, max_bytes: int = LOCAL_CACHE_MAX_BYTES, max_entry_ratio: float = LOCAL_CACHE_MAX_ENTRY_RATIO):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = int(max_bytes * max_entry_ratio)
+        self._entries: "OrderedDict[str, Tuple[object, int, float]]" = OrderedDict()
+        self._size = 0
+        self._sketch = FrequencySketch()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        self._sketch.add(key)
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        value, size, expires_at = item
+        if time.time() >= expires_at:
+            self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value, size: int, expires_at: float, max_ttl: Optional[int] = None) -> bool:
+        if max_ttl is not None:
+            expires_at = min(expires_at, time.time() + max_ttl)
+        size += ENTRY_OVERHEAD
+        if size > self.max_entry_bytes or expires_at <= time.time():
+            return False
+        self._drop(key)
+        candidate = self._sketch.estimate(key)
+        while self._size + size > self.max_bytes and self._entries:
+            victim = next(iter(self._entries))
+            if candidate <= self._sketch.estimate(victim) and time.time() < self._entries[victim][2]:
+                self.rejected += 1
+                return False
+            self._drop(victim)
+            self.evictions += 1
+        self._entries[key] = (value, size, expires_at)
+        self._size += size
+        return True
+
+    def invalidate(self, keys: Iterable[str]):
+        for key in keys:
+            self._drop(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def _drop(self, key: str):
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self._size -= item[1]
+
+    def on_change(self, message: dict):
+        if message.get("origin") == WORKER_ID:
+            return
+        keys = message.get("keys")
+        if keys is None:
+            self.clear()
+        else:
+            self.invalidate(keys)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+async def broadcast_invalidation(keys: Optional[List[str]]):
+    """Tell the other workers to drop their L1 copies; ``None`` clears everything."""
+    try:
+        await event_bus.publish(CACHE_CHANNEL, {"keys": keys, "origin": WORKER_ID})
+    except Exception as e:
+        logger.warning(f"Could not broadcast cache invalidation: {e}")
+
+
+local_cache = LocalCache()
@@ -0,0 +1,99 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
+import redis
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+
+class EventBus:
+    """Fans small JSON messages out to every gateway worker over Redis pub/sub."""
+
+    def __init__(self, redis_url: Optional[str]):
+        self.redis_url = redis_url
+        self._handlers: Dict[str, List[Callable[[dict], Any]]] = {}
+        self._client: Optional[Redis] = None
+        self._sync_client: Optional[redis.Redis] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> Redis:
+        if self._client is None:
+            self._client = Redis.from_url(self.redis_url, decode_responses=True)
+        return self._client
+
+    @property
+    def sync_client(self) -> redis.Redis:
+        # For the sync (threadpool) CRUD endpoints
+        if self._sync_client is None:
+            self._sync_client = redis.Redis.from_url(self.redis_url, decode_responses=True)
+        return self._sync_client
+
+    def subscribe(self, channel: str, handler: Callable[[dict], Any]):
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def publish(self, channel: str, message: dict):
+        await self.client.publish(channel, json.dumps(message))
+
+    def publish_sync(self, channel: str, message: dict):
+        self.sync_client.publish(channel, json.dumps(message))
+
+    async def start(self):
+        if self._task is None and self._handlers:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+    async def _listen(self):
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(*self._handlers.keys())
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    await self._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event bus connection lost, resubscribing: {e}")
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _dispatch(self, channel: str, data: str):
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            logger.warning(f"Ignoring malformed event on {channel}: {data!r}")
+            return
+        for handler in self._handlers.get(channel, []):
+            try:
+                result = handler(payload)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Event handler for {channel} failed: {e}")
+
+
+event_bus = EventBus(os.getenv("REDIS_URL"))
@@ -0,0 +1,270 @@
+import hashlib
+import logging
+import os
+import time
+from typing import Iterable, List, Optional, Sequence
+from redis.asyncio import Redis
+from DLL.cache_codec import compress, decompress
+from DLL.local_cache import LocalCache, broadcast_invalidation
+
+logger = logging.getLogger(__name__)
+
+# Indexes are sorted sets of cache keys scored by when each key expires. Expired members are
+# pruned on every write and purge, and an index nobody writes to expires after CACHE_INDEX_TTL.
+CACHE_INDEX_TTL = int(os.getenv("CACHE_INDEX_TTL", 24 * 3600))
+PURGE_BATCH = 500
+
+
+def cache_key(channel: str, prefix: Optional[str], path: str) -> str:
+    return f"cache:{channel}:{prefix or 'default'}:{path}"
+
+
+def channel_index(channel: str) -> str:
+    return f"cacheindex:channel:{channel}"
+
+
+def prefix_index(prefix: str, channel: Optional[str] = None) -> str:
+    return f"cacheindex:prefix:{channel}:{prefix}" if channel else f"cacheindex:prefix:{prefix}"
+
+
+def path_index(channel: str, path: str) -> str:
+    """Index of every cached key strictly below ``path`` on ``channel``."""
+    return f"cacheindex:path:{channel}:{path}"
+
+
+def cache_indexes(channel: str, prefix: Optional[str], path: str) -> List[str]:
+    """Indexes a key is added to: its channel, its prefix (overall and per channel) and each ancestor path."""
+    prefix = prefix or "default"
+    indexes = [channel_index(channel), prefix_index(prefix), prefix_index(prefix, channel)]
+    segments = [segment for segment in path.split("/") if segment]
+    for depth in range(1, len(segments)):
+        indexes.append(path_index(channel, "/" + "/".join(segments[:depth])))
+    return indexes
+
+
+def split_cache_key(key: str):
+    """``(channel, prefix, path)`` of a key built by cache_key()."""
+    _, channel, prefix, path = key.split(":", 3)
+    return channel, prefix, path
+
+
+class CacheEntry:
+    """Cached upstream payload with the times needed to tell fresh, stale and expired apart.
+
+    ``body`` holds the bytes as the core API sent them, compressed with
+    ``encoding`` when that is set, and is never parsed.
+    """
+
+    def __init__(self, body: bytes, content_type: str, stored_at: float, fresh_until: float, digest: str = "",
+                 etag: Optional[str] = None, last_modified: Optional[str] = None, encoding: Optional[str] = None):
+        self.body = body
+        self.content_type = content_type
+        self.encoding = encoding
+        self.stored_at = stored_at
+        self.fresh_until = fresh_until
+        self.digest = digest
+        # Validators as sent by the core API, replayed on revalidation
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def client_etag(self) -> str:
+        # Upstream ETag when there is one, otherwise a weak one from the body digest
+        return self.etag or f'W/"{self.digest}"'
+
+    def decoded(self) -> bytes:
+        return decompress(self.body, self.encoding)
+
+    def validators(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) < self.fresh_until
+
+    def within(self, grace: int, now: Optional[float] = None) -> bool:
+        """True while the entry is at most ``grace`` seconds past its freshness."""
+        return (time.time() if now is None else now) < self.fresh_until + grace
+
+
+class ResponseCache:
+    """Read-through cache for upstream payloads stored in Redis.
+
+    Each entry is a hash with the raw body (compressed past a size threshold),
+    its content type, ``stored_at`` and ``fresh_until``; the client must not
+    decode responses.
+    The key itself lives ``keep_for`` seconds longer than its freshness, so
+    stale copies stay around for stale-while-revalidate and stale-if-error.
+    """
+
+    def __init__(self, redis_client: Redis, local: Optional[LocalCache] = None):
+        self.redis_client = redis_client
+        # Optional in-process L1; fresh entries are served from it without a Redis round trip
+        self.local = local
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.stale_errors = 0
+        self.revalidated = 0
+        self.errors = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    async def get(self, key: str, max_ttl: Optional[int] = None) -> Optional[CacheEntry]:
+        if self.local is not None:
+            entry = self.local.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+        try:
+            cached = await self.redis_client.hgetall(key)
+        except Exception as e:
+            # A Redis outage must not take the proxy down, treat it as a miss
+            self.errors += 1
+            logger.warning(f"Cache read failed for {key}: {e}")
+            return None
+
+        entry = self._entry(cached)
+        if entry is None or not entry.is_fresh():
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._keep_local(key, entry, max_ttl)
+        return entry
+
+    async def peek(self, key: str, fresh_only: bool = True) -> Optional[CacheEntry]:
+        # Same lookup without touching the counters; used by single-flight followers and the warmer
+        if self.local is not None:
+            entry = self.local.get(key)
+            if entry is not None:
+                return entry
+        try:
+            entry = self._entry(await self.redis_client.hgetall(key))
+        except Exception:
+            return None
+        if entry is not None and fresh_only and not entry.is_fresh():
+            return None
+        return entry
+
+    async def set(self, key: str, body: bytes, content_type: str, ttl: int, keep_for: int = 0,
+                  etag: Optional[str] = None, last_modified: Optional[str] = None,
+                  codec: Optional[str] = None, indexes: Sequence[str] = ()) -> CacheEntry:
+        now = time.time()
+        digest = hashlib.sha1(body).hexdigest()
+        stored, encoding = compress(body, codec)
+        self.raw_bytes += len(body)
+        self.stored_bytes += len(stored)
+        entry = CacheEntry(stored, content_type, now, now + ttl, digest, etag, last_modified, encoding)
+        mapping = {
+            "body": stored,
+            "content_type": content_type,
+            "stored_at": now,
+            "fresh_until": entry.fresh_until,
+            "digest": entry.digest,
+        }
+        if etag:
+            mapping["etag"] = etag
+        if last_modified:
+            mapping["last_modified"] = last_modified
+        if encoding:
+            mapping["encoding"] = encoding
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, max(1, ttl + keep_for))
+                for index in indexes:
+                    pipe.zadd(index, {key: now + max(1, ttl + keep_for)})
+                    pipe.zremrangebyscore(index, "-inf", now)
+                    pipe.expire(index, max(CACHE_INDEX_TTL, ttl + keep_for))
+                await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache write failed for {key}: {e}")
+        if self.local is not None:
+            self._keep_local(key, entry, ttl)
+            # Other workers may hold the previous body
+            await broadcast_invalidation([key])
+        return entry
+
+    async def refresh(self, key: str, entry: CacheEntry, ttl: int, keep_for: int = 0) -> CacheEntry:
+        """Extend an entry the core API confirmed as unchanged (304), keeping body and validators."""
+        self.revalidated += 1
+        now = time.time()
+        refreshed = CacheEntry(
+            entry.body, entry.content_type, now, now + ttl, entry.digest, entry.etag, entry.last_modified, entry.encoding
+        )
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={"stored_at": now, "fresh_until": refreshed.fresh_until})
+                pipe.expire(key, max(1, ttl + keep_for))
+                for index in cache_indexes(*split_cache_key(key)):
+                    pipe.zadd(index, {key: now + max(1, ttl + keep_for)}, xx=True)
+                await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache refresh failed for {key}: {e}")
+        self._keep_local(key, refreshed, ttl)
+        return refreshed
+
+    async def indexed_keys(self, indexes: Iterable[str]) -> List[str]:
+        """Keys in any of ``indexes`` that have not expired yet."""
+        now = time.time()
+        members = set()
+        for index in indexes:
+            members.update(await self.redis_client.zrangebyscore(index, now, "+inf"))
+        return sorted(member.decode() for member in members)
+
+    async def purge(self, keys: Sequence[str]) -> int:
+        """Delete ``keys`` and their index entries, here and in every worker's L1; returns how many existed."""
+        deleted = 0
+        for start in range(0, len(keys), PURGE_BATCH):
+            batch = keys[start:start + PURGE_BATCH]
+            members = {}
+            for key in batch:
+                for index in cache_indexes(*split_cache_key(key)):
+                    members.setdefault(index, []).append(key)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(*batch)
+                for index, index_keys in members.items():
+                    pipe.zrem(index, *index_keys)
+                    pipe.zremrangebyscore(index, "-inf", time.time())
+                results = await pipe.execute()
+            deleted += results[0]
+        if keys and self.local is not None:
+            self.local.invalidate(keys)
+            await broadcast_invalidation(list(keys))
+        return deleted
+
+    def _keep_local(self, key: str, entry: CacheEntry, max_ttl: Optional[int]):
+        if self.local is not None:
+            self.local.put(key, entry, len(entry.body), entry.fresh_until, max_ttl)
+
+    @staticmethod
+    def _entry(cached: dict) -> Optional[CacheEntry]:
+        if not cached or b"body" not in cached:
+            return None
+        meta = {field.decode(): value.decode() for field, value in cached.items() if field != b"body"}
+        return CacheEntry(
+            cached[b"body"], meta.get("content_type", "application/json"),
+            float(meta["stored_at"]), float(meta["fresh_until"]),
+            meta.get("digest", ""), meta.get("etag"), meta.get("last_modified"), meta.get("encoding"),
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "stale_on_error": self.stale_errors,
+            "revalidated": self.revalidated,
+            "errors": self.errors,
+            "compression_ratio": round(self.stored_bytes / self.raw_bytes, 4) if self.raw_bytes else None,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "local": self.local.stats() if self.local is not None else None,
+        }
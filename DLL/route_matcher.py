@@ -0,0 +1,110 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class RouteMatch:
+    def __init__(self, route: dict, params: Dict[str, str]):
+        self.route = route
+        self.params = params
+
+    @property
+    def path(self) -> str:
+        return self.route["path"]
+
+    @property
+    def maxcache(self) -> int:
+        return self.route["maxcache"]
+
+    @property
+    def stale_ttl(self) -> int:
+        return self.route.get("stale_ttl") or 0
+
+    @property
+    def stale_if_error_ttl(self) -> int:
+        return self.route.get("stale_if_error_ttl") or 0
+
+    @property
+    def cache_codec(self) -> Optional[str]:
+        return self.route.get("cache_codec")
+
+    @property
+    def cache_key_prefix(self) -> Optional[str]:
+        return self.route.get("cache_key_prefix")
+
+
+class _Node:
+    __slots__ = ("static", "param", "leaf")
+
+    def __init__(self):
+        self.static: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        # (route, param names in path order) when a template ends here
+        self.leaf: Optional[Tuple[dict, List[str]]] = None
+
+
+def _split(path: str) -> List[str]:
+    return path.strip("/").split("/") if path.strip("/") else []
+
+
+def _param_name(segment: str) -> Optional[str]:
+    if len(segment) > 2 and segment[0] == "{" and segment[-1] == "}":
+        return segment[1:-1]
+    return None
+
+
+class RouteMatcher:
+    """Segment trie over APIRoute templates with ``{param}`` wildcards.
+
+    Lookups walk one node per path segment; static segments win over
+    wildcards, so ``/orders/invoice/{id}`` is preferred to ``/orders/{order_id}``
+    when both could match.
+    """
+
+    def __init__(self, routes: Iterable[dict] = ()):
+        self._root = _Node()
+        self.size = 0
+        for route in routes:
+            self.add(route)
+
+    def add(self, route: dict):
+        node = self._root
+        names = []
+        for segment in _split(route["path"]):
+            name = _param_name(segment)
+            if name is not None:
+                names.append(name)
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                node = node.static.setdefault(segment, _Node())
+        if node.leaf is None:
+            self.size += 1
+        node.leaf = (route, names)
+
+    def match(self, path: str) -> Optional[RouteMatch]:
+        if path != "/" and path.endswith("/"):
+            return None
+        segments = _split(path)
+        values: List[str] = []
+        leaf = self._walk(self._root, segments, 0, values)
+        if leaf is None:
+            return None
+        route, names = leaf
+        return RouteMatch(route, dict(zip(names, values)))
+
+    def _walk(self, node: _Node, segments: List[str], index: int, values: List[str]):
+        if index == len(segments):
+            return node.leaf
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            leaf = self._walk(child, segments, index + 1, values)
+            if leaf is not None:
+                return leaf
+        if node.param is not None and segment:
+            values.append(segment)
+            leaf = self._walk(node.param, segments, index + 1, values)
+            if leaf is not None:
+                return leaf
+            values.pop()
+        return None
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, EmailStr
 
 from users.models import StatusEnum
@@ -54,6 +54,14 @@ class ChannelCreate(BaseModel):
     auth_url: Optional[str] = None
     api_key: Optional[str] = None
     status: StatusEnum
+    http2: bool = False
+    max_connections: Optional[int] = None
+    max_keepalive_connections: Optional[int] = None
+    keepalive_expiry: Optional[float] = None
+    connect_timeout: Optional[float] = None
+    read_timeout: Optional[float] = None
+    rate_limit_calls: Optional[int] = None
+    rate_limit_period: Optional[int] = None
 
 class ChannelUpdate(BaseModel):
     name: Optional[str] = None
@@ -61,6 +69,14 @@ class ChannelUpdate(BaseModel):
     auth_url: Optional[str] = None
     api_key: Optional[str] = None
     status: Optional[StatusEnum] = None
+    http2: Optional[bool] = None
+    max_connections: Optional[int] = None
+    max_keepalive_connections: Optional[int] = None
+    keepalive_expiry: Optional[float] = None
+    connect_timeout: Optional[float] = None
+    read_timeout: Optional[float] = None
+    rate_limit_calls: Optional[int] = None
+    rate_limit_period: Optional[int] = None
     
 class ChannelResponse(ChannelCreate):
     id: int
@@ -74,6 +90,11 @@ class ApiRoutePathBase(BaseModel):
     path: str
     cache_key_prefix: str
     maxcache: int
+    stale_ttl: Optional[int] = None
+    stale_if_error_ttl: Optional[int] = None
+    cache_codec: Optional[Literal["zstd", "gzip", "none"]] = None
+    rate_limit_calls: Optional[int] = None
+    rate_limit_period: Optional[int] = None
     description: Optional[str] = None
     status: StatusEnum = StatusEnum.active
 
@@ -91,4 +112,9 @@ class ShowBlockedResponse(BaseModel):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+class CachePurgeRequest(BaseModel):
+    # Any combination narrows the purge; path accepts "/clients/42", "/clients/42/*" or a template
+    channel: Optional[str] = None
+    cache_key_prefix: Optional[str] = None
+    path: Optional[str] = None
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Deletes the lock only if we still own it, so a slow leader can't release a newer one
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key: one leader runs, followers await its result."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]],
+                 load: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._run(key, fn, load)
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark it retrieved so a leader without followers doesn't log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]],
+                   load: Optional[Callable[[], Awaitable[Any]]]) -> Any:
+        return await fn()
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+
+class RedisSingleFlight(SingleFlight):
+    """Single-flight across workers using a Redis lock per key.
+
+    The in-process layer still runs first, so each worker has at most one caller
+    contending for the lock. A worker that loses the lock polls ``load`` (normally
+    the cache lookup) until the leader has stored the result, and falls back to
+    fetching itself when the lock disappears or ``wait_timeout`` is reached.
+    """
+
+    def __init__(self, redis_client: Redis, lock_ttl: float = 10.0,
+                 wait_timeout: float = 10.0, poll_interval: float = 0.05):
+        super().__init__()
+        self.redis_client = redis_client
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._release = redis_client.register_script(RELEASE_LOCK_SCRIPT)
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]],
+                   load: Optional[Callable[[], Awaitable[Any]]]) -> Any:
+        lock_key = f"singleflight:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis_client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            logger.warning(f"Single-flight lock unavailable for {key}: {e}")
+            return await fn()
+
+        if acquired:
+            try:
+                return await fn()
+            finally:
+                try:
+                    await self._release(keys=[lock_key], args=[token])
+                except Exception as e:
+                    logger.warning(f"Single-flight lock release failed for {key}: {e}")
+
+        if load is not None:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.wait_timeout
+            try:
+                while loop.time() < deadline:
+                    await asyncio.sleep(self.poll_interval)
+                    result = await load()
+                    if result is not None:
+                        return result
+                    if not await self.redis_client.exists(lock_key):
+                        # The leader may have stored its result right before releasing
+                        result = await load()
+                        if result is not None:
+                            return result
+                        break
+            except Exception as e:
+                # Redis went away while waiting; fetch ourselves like a failed acquire does
+                logger.warning(f"Single-flight wait failed for {key}: {e}")
+        return await fn()
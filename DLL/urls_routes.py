@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from auth.dependencies import get_db
+from DLL.config_snapshot import config_store
 from DLL.schemas import ApiRoutePathBase, RoutepathResponse
 from users.models import APIRoute
 from sqlalchemy.exc import SQLAlchemyError
@@ -24,6 +25,7 @@ def create_routePath(pathurls: ApiRoutePathBase, db: Session = Depends(get_db)):
         db.add(new_APIRoute)
         db.commit()
         db.refresh(new_APIRoute)
+        config_store.invalidate(db)
 
         return new_APIRoute
 
@@ -65,6 +67,7 @@ def update_routePath(route_id: int, updates: ApiRoutePathBase, db: Session = Dep
         
         db.commit()
         db.refresh(routeUpdate)
+        config_store.invalidate(db)
         return routeUpdate
 
     except SQLAlchemyError:
@@ -85,6 +88,7 @@ def delete_routePath(route_id: int, db: Session = Depends(get_db)):
         
         db.delete(route)
         db.commit()
+        config_store.invalidate(db)
         return {"message": "Route path url deleted successfully", "result": True}
 
     except SQLAlchemyError:
@@ -1,19 +1,202 @@
+import asyncio
+import logging
+import math
 import time
+import uuid
 from functools import wraps
-from typing import Callable, Any
+from typing import Callable, Any, Dict, List, Optional, Tuple
 from fastapi import HTTPException, Depends, Request
 from redis.asyncio import Redis
 
+logger = logging.getLogger(__name__)
+
+# Both scripts take one key per quota with (limit, period_ms) pairs in ARGV after ARGV[1],
+# check every quota first and only record the request when all of them allow it.
+# They return {allowed, remaining, retry_after_ms, reset_ms, index of the tightest quota}.
+
+# Sliding window over a sorted set of request timestamps; ARGV[1] is a unique member id
+SLIDING_WINDOW_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local allowed = 1
+local remaining = -1
+local retry_after = 0
+local reset = 0
+local tightest = 1
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i * 2])
+    local period = tonumber(ARGV[i * 2 + 1])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - period)
+    local count = redis.call('ZCARD', key)
+    local key_reset = period
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    if oldest[2] then
+        key_reset = tonumber(oldest[2]) + period - now
+    end
+    if count >= limit then
+        allowed = 0
+        local freeing = redis.call('ZRANGE', key, count - limit, count - limit, 'WITHSCORES')
+        retry_after = math.max(retry_after, tonumber(freeing[2]) + period - now)
+    end
+    local left = limit - count
+    if remaining < 0 or left < remaining then
+        remaining = left
+        reset = key_reset
+        tightest = i
+    end
+end
+if allowed == 1 then
+    for i, key in ipairs(KEYS) do
+        redis.call('ZADD', key, now, ARGV[1])
+        redis.call('PEXPIRE', key, tonumber(ARGV[i * 2 + 1]))
+    end
+    remaining = remaining - 1
+end
+return {allowed, math.max(remaining, 0), retry_after, reset, tightest}
+"""
+
+# GCRA (token bucket): one "theoretical arrival time" per key, O(1) memory; ARGV[1] is the cost
+GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local cost = tonumber(ARGV[1])
+local allowed = 1
+local remaining = -1
+local retry_after = 0
+local reset = 0
+local tightest = 1
+local new_tats = {}
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i * 2])
+    local period = tonumber(ARGV[i * 2 + 1])
+    local interval = period / limit
+    local tat = tonumber(redis.call('GET', key) or now)
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval * cost
+    local allow_at = new_tat - period
+    local left
+    if allow_at > now then
+        allowed = 0
+        retry_after = math.max(retry_after, allow_at - now)
+        left = 0
+    else
+        left = math.floor((now - allow_at) / interval)
+    end
+    new_tats[i] = new_tat
+    if remaining < 0 or left < remaining then
+        remaining = left
+        reset = new_tat - now
+        tightest = i
+    end
+end
+if allowed == 1 then
+    for i, key in ipairs(KEYS) do
+        redis.call('SET', key, string.format('%.3f', new_tats[i]), 'PX', math.ceil(new_tats[i] - now))
+    end
+end
+return {allowed, remaining, math.ceil(retry_after), math.ceil(reset), tightest}
+"""
+
+# Hybrid mode: grant up to ARGV[3] tokens from a GCRA key at once; ARGV[1..2] are limit, period_ms.
+# Returns {granted, remaining, retry_after_ms, reset_ms}.
+LEASE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local interval = period / limit
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local available = math.max(math.floor((now + period - tat) / interval), 0)
+local granted = math.min(tonumber(ARGV[3]), available)
+if granted == 0 then
+    return {0, 0, math.ceil(tat + interval - period - now), math.ceil(tat - now)}
+end
+local new_tat = tat + interval * granted
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+return {granted, available - granted, 0, math.ceil(new_tat - now)}
+"""
+
+# Give ARGV[3] unused leased tokens back to a GCRA key
+RETURN_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat then
+    return 0
+end
+tat = tat - tonumber(ARGV[2]) / tonumber(ARGV[1]) * tonumber(ARGV[3])
+if tat <= now then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('SET', KEYS[1], string.format('%.3f', tat), 'PX', math.ceil(tat - now))
+end
+return 1
+"""
+
+
 class RateLimitConfig:
-    def __init__(self, max_calls: int, period: int):
+    def __init__(self, max_calls: int, period: int, algorithm: str = "sliding_window"):
         self.max_calls = max_calls
         self.period = period
+        # "sliding_window" (exact, sorted set) or "token_bucket" (GCRA, one value per key)
+        self.algorithm = algorithm
+
+
+class RateLimitResult:
+    def __init__(self, allowed: bool, limit: int, remaining: int, retry_after: float, reset: float):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.retry_after = retry_after
+        self.reset = reset
+
+    def headers(self) -> dict:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+Quota = Tuple[str, RateLimitConfig]
 
 
 class RateLimiter:
+    """Atomic Redis rate limiter: one script call per request, whatever the number of quotas."""
+
     def __init__(self, redis_client: Redis, config: RateLimitConfig):
         self.redis_client = redis_client
         self.config = config
+        self._sliding_window = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._gcra = redis_client.register_script(GCRA_SCRIPT)
+
+    async def hit(self, quotas: List[Quota], cost: int = 1) -> Optional[RateLimitResult]:
+        """Count one request against every quota; all of them must allow it.
+
+        Returns None when Redis is unavailable, in which case the request is let through.
+        """
+        if not quotas:
+            return None
+        keys = [key for key, _ in quotas]
+        args: List[Any] = [cost if self.config.algorithm == "token_bucket" else uuid.uuid4().hex]
+        for _, quota in quotas:
+            args.extend([quota.max_calls, quota.period * 1000])
+        script = self._gcra if self.config.algorithm == "token_bucket" else self._sliding_window
+        try:
+            allowed, remaining, retry_after, reset, tightest = await script(keys=keys, args=args)
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return None
+        limit = quotas[int(tightest) - 1][1].max_calls
+        return RateLimitResult(bool(allowed), limit, int(remaining), int(retry_after) / 1000, int(reset) / 1000)
 
     def rate_limit(self):
         def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
@@ -25,26 +208,144 @@ class RateLimiter:
 
                 url_path = request.url.path
                 key = f"rate_limit:{username}:{url_path}"
-                now = time.time()
-
-                timestamps = await self.redis_client.lrange(key, 0, -1)
-                timestamps = [float(ts) for ts in timestamps if ts]
-
-                timestamps = [ts for ts in timestamps if now - ts < self.config.period]
-
-                if len(timestamps) >= self.config.max_calls:
-                    wait = self.config.period - (now - timestamps[0])
+                result = await self.hit([(key, self.config)])
+                if result is not None and not result.allowed:
                     raise HTTPException(
                         status_code=429,
-                        detail=f"Rate limit exceeded for {url_path}. Retry after {wait:.2f} seconds"
+                        detail=f"Rate limit exceeded for {url_path}. Retry after {result.retry_after:.2f} seconds",
+                        headers=result.headers(),
                     )
-                timestamps.append(now)
-                async with self.redis_client.pipeline() as pipe:
-                    await pipe.delete(key)
-                    await pipe.rpush(key, *map(str, timestamps))
-                    await pipe.expire(key, self.config.period)
-                    await pipe.execute()
 
                 return await func(request, *args, token_data=token_data, **kwargs)
             return wrapper
         return decorator
+
+
+class _Lease:
+    __slots__ = ("tokens", "limit", "remaining", "expires_at", "retry_at", "reset_at")
+
+    def __init__(self, tokens: int, limit: int, remaining: int, expires_at: float, retry_at: float, reset_at: float):
+        self.tokens = tokens  # Leased from Redis, not yet spent by this worker
+        self.limit = limit
+        self.remaining = remaining  # Left in Redis when the lease was taken
+        self.expires_at = expires_at
+        self.retry_at = retry_at
+        self.reset_at = reset_at
+
+
+class HybridRateLimiter(RateLimiter):
+    """Local token buckets fed by batched leases from a Redis GCRA key.
+
+    Each worker takes ``lease_fraction`` of a quota at a time and only calls
+    Redis when its lease is spent or expired, so limits stay approximately
+    global. Unused tokens go back to Redis when a lease expires. Leasing
+    always uses the token-bucket algorithm, whatever ``config.algorithm`` says.
+    """
+
+    def __init__(self, redis_client: Redis, config: RateLimitConfig, lease_fraction: float = 0.1,
+                 lease_ttl: Optional[float] = None, sweep_interval: float = 30.0):
+        super().__init__(redis_client, config)
+        self.lease_fraction = lease_fraction
+        self.lease_ttl = lease_ttl
+        self.sweep_interval = sweep_interval
+        self._lease_script = redis_client.register_script(LEASE_SCRIPT)
+        self._return_script = redis_client.register_script(RETURN_SCRIPT)
+        self._leases: Dict[str, _Lease] = {}
+        self._quotas: Dict[str, RateLimitConfig] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: set = set()
+        self._last_sweep = time.monotonic()
+
+    def _lease_size(self, quota: RateLimitConfig, cost: int) -> int:
+        return max(cost, int(quota.max_calls * self.lease_fraction), 1)
+
+    def _ttl(self, quota: RateLimitConfig) -> float:
+        # By default a lease lives as long as Redis needs to refill it
+        return self.lease_ttl if self.lease_ttl is not None else quota.period * self.lease_fraction
+
+    async def hit(self, quotas: List[Quota], cost: int = 1) -> Optional[RateLimitResult]:
+        if not quotas:
+            return None
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._sweep(now)
+
+        leases = []
+        for key, quota in quotas:
+            lease = self._leases.get(key)
+            if lease is None or lease.expires_at <= now or (lease.tokens < cost and lease.retry_at <= now):
+                lease = await self._renew(key, quota, cost)
+                if lease is None:
+                    return None
+            leases.append(lease)
+
+        denied = [lease for lease in leases if lease.tokens < cost]
+        if denied:
+            tightest = max(denied, key=lambda lease: lease.retry_at)
+            return RateLimitResult(False, tightest.limit, 0, tightest.retry_at - now, tightest.reset_at - now)
+
+        for lease in leases:
+            lease.tokens -= cost
+        tightest = min(leases, key=lambda lease: lease.remaining + lease.tokens)
+        return RateLimitResult(True, tightest.limit, tightest.remaining + tightest.tokens, 0, tightest.reset_at - now)
+
+    async def _renew(self, key: str, quota: RateLimitConfig, cost: int) -> Optional[_Lease]:
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            lease = self._leases.get(key)
+            if lease is not None and lease.expires_at > now and (lease.tokens >= cost or lease.retry_at > now):
+                # Renewed by another request while this one waited for the lock
+                return lease
+            leftover = 0
+            if lease is not None:
+                if lease.expires_at <= now:
+                    await self._give_back(key, quota, lease.tokens)
+                else:
+                    leftover = lease.tokens
+            try:
+                granted, remaining, retry_after, reset = await self._lease_script(
+                    keys=[key], args=[quota.max_calls, quota.period * 1000, self._lease_size(quota, cost) - leftover]
+                )
+            except Exception as e:
+                logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+                return None
+            lease = _Lease(
+                leftover + int(granted), quota.max_calls, int(remaining),
+                expires_at=now + self._ttl(quota),
+                retry_at=now + int(retry_after) / 1000,
+                reset_at=now + int(reset) / 1000,
+            )
+            self._leases[key] = lease
+            self._quotas[key] = quota
+            return lease
+
+    async def _give_back(self, key: str, quota: RateLimitConfig, tokens: int):
+        if tokens <= 0:
+            return
+        try:
+            await self._return_script(keys=[key], args=[quota.max_calls, quota.period * 1000, tokens])
+        except Exception as e:
+            logger.warning(f"Could not return {tokens} leased tokens for {key}: {e}")
+
+    def _sweep(self, now: float):
+        """Drop expired leases and hand their unused tokens back in the background."""
+        self._last_sweep = now
+        for key in [key for key, lease in self._leases.items() if lease.expires_at <= now]:
+            lock = self._locks.get(key)
+            if lock is not None and lock.locked():
+                continue
+            lease = self._leases.pop(key)
+            quota = self._quotas.pop(key)
+            self._locks.pop(key, None)
+            if lease.tokens > 0:
+                task = asyncio.create_task(self._give_back(key, quota, lease.tokens))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def release_all(self):
+        """Return every outstanding lease, e.g. on shutdown."""
+        leases, self._leases = self._leases, {}
+        await asyncio.gather(*(self._give_back(key, self._quotas[key], lease.tokens) for key, lease in leases.items()))
+        self._quotas.clear()
+        self._locks.clear()
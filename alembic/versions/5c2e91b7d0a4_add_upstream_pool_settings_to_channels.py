@@ -0,0 +1,38 @@
+"""Add upstream pool settings to channels
+
+Revision ID: 5c2e91b7d0a4
+Revises: 0d4160cd8c8d
+Create Date: 2026-10-18 09:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e91b7d0a4'
+down_revision: Union[str, None] = '0d4160cd8c8d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('channels', sa.Column('http2', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('channels', sa.Column('max_connections', sa.Integer(), nullable=True))
+    op.add_column('channels', sa.Column('max_keepalive_connections', sa.Integer(), nullable=True))
+    op.add_column('channels', sa.Column('keepalive_expiry', sa.Float(), nullable=True))
+    op.add_column('channels', sa.Column('connect_timeout', sa.Float(), nullable=True))
+    op.add_column('channels', sa.Column('read_timeout', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('channels', 'read_timeout')
+    op.drop_column('channels', 'connect_timeout')
+    op.drop_column('channels', 'keepalive_expiry')
+    op.drop_column('channels', 'max_keepalive_connections')
+    op.drop_column('channels', 'max_connections')
+    op.drop_column('channels', 'http2')
@@ -0,0 +1,34 @@
+"""Add rate limit quotas to channels and routes
+
+Revision ID: 8f3a1c6e2b57
+Revises: 5c2e91b7d0a4
+Create Date: 2026-10-18 14:27:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3a1c6e2b57'
+down_revision: Union[str, None] = '5c2e91b7d0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('channels', sa.Column('rate_limit_calls', sa.Integer(), nullable=True))
+    op.add_column('channels', sa.Column('rate_limit_period', sa.Integer(), nullable=True))
+    op.add_column('api_route_path', sa.Column('rate_limit_calls', sa.Integer(), nullable=True))
+    op.add_column('api_route_path', sa.Column('rate_limit_period', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('api_route_path', 'rate_limit_period')
+    op.drop_column('api_route_path', 'rate_limit_calls')
+    op.drop_column('channels', 'rate_limit_period')
+    op.drop_column('channels', 'rate_limit_calls')
@@ -0,0 +1,30 @@
+"""Add stale ttls to api routes
+
+Revision ID: b71d4e09c3a2
+Revises: 8f3a1c6e2b57
+Create Date: 2026-10-18 16:03:52.440917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71d4e09c3a2'
+down_revision: Union[str, None] = '8f3a1c6e2b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('api_route_path', sa.Column('stale_ttl', sa.Integer(), nullable=True))
+    op.add_column('api_route_path', sa.Column('stale_if_error_ttl', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('api_route_path', 'stale_if_error_ttl')
+    op.drop_column('api_route_path', 'stale_ttl')
@@ -0,0 +1,28 @@
+"""Add cache codec to api routes
+
+Revision ID: e4a95f1d7c68
+Revises: b71d4e09c3a2
+Create Date: 2026-10-18 18:41:19.027563
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a95f1d7c68'
+down_revision: Union[str, None] = 'b71d4e09c3a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('api_route_path', sa.Column('cache_codec', sa.String(length=10), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('api_route_path', 'cache_codec')
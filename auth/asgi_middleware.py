@@ -0,0 +1,131 @@
+import json
+import logging
+import time
+import uuid
+from typing import Optional
+from starlette.datastructures import URL
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from auth import blocklist_cache
+from auth.blocklist_cache import client_addresses
+from logger import request_id_var
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _channel(scope: Scope) -> Optional[str]:
+    # The router writes path_params into the shared scope once a route matched
+    return scope.get("path_params", {}).get("channel")
+
+
+async def _send_response(send: Send, status: int, body: bytes, content_type: bytes):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class GatewayGateMiddleware:
+    """IP and domain blocking as raw ASGI, before any Request object is built."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        blocked_ips = blocklist_cache.blocked_ips
+        if len(blocked_ips):
+            client = scope.get("client")
+            peer = client[0] if client else None
+            for address in client_addresses(_header(scope, b"x-forwarded-for"), peer):
+                if blocked_ips.contains(address):
+                    await _send_response(send, 403, b"Access Denied: IP blocked", b"text/plain; charset=utf-8")
+                    return
+
+        blocked_domains = blocklist_cache.blocked_domains
+        if blocked_domains:
+            domain_only = (_header(scope, b"host") or "").split(":")[0].lower()
+            if domain_only in blocked_domains:
+                await _send_response(send, 403, b"Access Denied: Domain blocked", b"text/plain; charset=utf-8")
+                return
+
+        await self.app(scope, receive, send)
+
+
+class AccessLogMiddleware:
+    """Logs every request/response pair without wrapping the body stream."""
+
+    def __init__(self, app: ASGIApp, logger: logging.Logger, skip_prefix: str = "/logs/apilogs/"):
+        self.app = app
+        self.logger = logger
+        self.skip_prefix = skip_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.time()
+        client = scope.get("client")
+        request_id = _header(scope, b"x-request-id") or uuid.uuid4().hex
+        request_id_var.set(request_id)
+        log_data = {
+            "request_id": request_id,
+            "client_ip": client[0] if client else "unknown",
+            "host": _header(scope, b"host") or "unknown",
+            "url": str(URL(scope=scope)),
+            "token": _header(scope, b"authorization") or "none",
+            "method": scope["method"],
+        }
+        incoming_log_data = {**log_data, "log_type": "INCOMING", "log_message": "Incoming request received"}
+        self.logger.info("Incoming request log", extra=incoming_log_data)
+
+        response_started = False
+        status_code = None
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started, status_code
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            processed_time = time.time() - start_time
+            error_log_data = {
+                **log_data,
+                "channel": _channel(scope),
+                "log_type": "ERROR",
+                "processed_time": f"{processed_time:.2f}s",
+                "error": str(e),
+                "log_message": "Error occurred while processing request",
+            }
+            self.logger.error("Error while processing request", extra=error_log_data)
+            if response_started:
+                raise
+            body = json.dumps({"detail": "An internal server error occurred."}).encode()
+            await _send_response(send, 500, body, b"application/json")
+            return
+
+        processed_time = time.time() - start_time
+        outgoing_log_data = {
+            **log_data,
+            "channel": _channel(scope),
+            "log_type": "OUTGOING",
+            "status_code": status_code,
+            "processed_time": f"{processed_time:.2f}s",
+            "log_message": "Outgoing response sent",
+        }
+        self.logger.info("Outgoing request log", extra=outgoing_log_data)
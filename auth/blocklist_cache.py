@@ -1,4 +1,173 @@
-from typing import Set
+import ipaddress
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
-blocked_ips: Set[str] = set()
-blocked_domains: Set[str] = set()
\ No newline at end of file
+
+def parse_ip(value: str) -> Optional[ipaddress._BaseAddress]:
+    """Parse an address as it shows up in headers: strips ports, brackets and quotes."""
+    value = value.strip().strip('"')
+    if not value or value.lower() == "unknown":
+        return None
+    if value.startswith("["):
+        # [2001:db8::1]:443
+        value = value[1:value.find("]")] if "]" in value else value[1:]
+    elif value.count(":") == 1:
+        # 203.0.113.7:51234
+        value = value.split(":", 1)[0]
+    try:
+        address = ipaddress.ip_address(value)
+    except ValueError:
+        return None
+    if address.version == 6 and address.ipv4_mapped is not None:
+        return address.ipv4_mapped
+    return address
+
+
+def client_addresses(forwarded_for: Optional[str], peer: Optional[str]) -> List[ipaddress._BaseAddress]:
+    """Every address a request claims to come from: the X-Forwarded-For chain plus the socket peer."""
+    addresses = []
+    if forwarded_for:
+        for part in forwarded_for.split(","):
+            address = parse_ip(part)
+            if address is not None:
+                addresses.append(address)
+    if peer:
+        address = parse_ip(peer)
+        if address is not None:
+            addresses.append(address)
+    return addresses
+
+
+class IPBlocklist:
+    """Blocked IPs and CIDR ranges for IPv4 and IPv6.
+
+    Exact addresses live in a hash set. Networks are kept per prefix length as
+    sets of their masked network bits, so a lookup costs one set probe per
+    distinct prefix length in use (at most 33 for IPv4, 129 for IPv6) no matter
+    how many ranges are blocked.
+    """
+
+    def __init__(self, entries: Iterable[str] = ()):
+        self._exact: Set[Tuple[int, int]] = set()
+        self._networks: Dict[Tuple[int, int], Set[int]] = {}
+        self._prefixes: Dict[int, List[int]] = {4: [], 6: []}
+        self.entries: Set[str] = set()
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: str) -> bool:
+        try:
+            network = ipaddress.ip_network(entry.strip(), strict=False)
+        except ValueError:
+            return False
+        self.entries.add(entry)
+        version, bits = network.version, network.max_prefixlen
+        if network.prefixlen == bits:
+            self._exact.add((version, int(network.network_address)))
+            return True
+        key = (version, network.prefixlen)
+        bucket = self._networks.get(key)
+        if bucket is None:
+            bucket = self._networks[key] = set()
+            self._prefixes[version] = sorted(self._prefixes[version] + [network.prefixlen])
+        bucket.add(int(network.network_address) >> (bits - network.prefixlen))
+        return True
+
+    def discard(self, entry: str):
+        try:
+            network = ipaddress.ip_network(entry.strip(), strict=False)
+        except ValueError:
+            return
+        self.entries.discard(entry)
+        version, bits = network.version, network.max_prefixlen
+        if network.prefixlen == bits:
+            self._exact.discard((version, int(network.network_address)))
+            return
+        key = (version, network.prefixlen)
+        bucket = self._networks.get(key)
+        if bucket is None:
+            return
+        bucket.discard(int(network.network_address) >> (bits - network.prefixlen))
+        if not bucket:
+            del self._networks[key]
+            self._prefixes[version] = [p for p in self._prefixes[version] if p != network.prefixlen]
+
+    def copy(self) -> "IPBlocklist":
+        clone = IPBlocklist()
+        clone._exact = set(self._exact)
+        clone._networks = {key: set(bucket) for key, bucket in self._networks.items()}
+        clone._prefixes = {version: list(prefixes) for version, prefixes in self._prefixes.items()}
+        clone.entries = set(self.entries)
+        return clone
+
+    def contains(self, address: ipaddress._BaseAddress) -> bool:
+        version, value = address.version, int(address)
+        if (version, value) in self._exact:
+            return True
+        bits = address.max_prefixlen
+        for prefixlen in self._prefixes[version]:
+            if (value >> (bits - prefixlen)) in self._networks[(version, prefixlen)]:
+                return True
+        return False
+
+    def __contains__(self, value) -> bool:
+        address = parse_ip(value) if isinstance(value, str) else value
+        return address is not None and self.contains(address)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+BLOCKLIST_CHANNEL = "gateway:blocklist"
+
+# Both are replaced, never mutated: readers grab the current object and use it without locks
+blocked_ips: IPBlocklist = IPBlocklist()
+blocked_domains: FrozenSet[str] = frozenset()
+
+# Deltas received while a full resync is loading, replayed on top of its result
+_resync_deltas: Optional[List[dict]] = None
+
+
+def begin_resync():
+    global _resync_deltas
+    _resync_deltas = []
+
+
+def cancel_resync():
+    global _resync_deltas
+    _resync_deltas = None
+
+
+def replace_blocklist(ips: Iterable[str], domains: Iterable[str]):
+    """Swap in a freshly loaded blocklist, keeping deltas that arrived during the load."""
+    global blocked_ips, blocked_domains, _resync_deltas
+    new_ips = IPBlocklist(ips)
+    new_domains = frozenset(domains)
+    for message in _resync_deltas or ():
+        new_ips, new_domains = _apply(message, new_ips, new_domains)
+    blocked_ips, blocked_domains = new_ips, new_domains
+    _resync_deltas = None
+
+
+def apply_blocklist_delta(message: dict):
+    """Apply an add/remove published on BLOCKLIST_CHANNEL to copies and swap them in."""
+    global blocked_ips, blocked_domains
+    if _resync_deltas is not None:
+        _resync_deltas.append(message)
+    blocked_ips, blocked_domains = _apply(message, blocked_ips, blocked_domains)
+
+
+def _apply(message: dict, ips: IPBlocklist, domains: FrozenSet[str]):
+    op = message.get("op")
+    values = [value for value in message.get("values") or [] if value]
+    if not values or op not in ("add", "remove"):
+        return ips, domains
+    if message.get("type") == "ip":
+        ips = ips.copy()
+        for value in values:
+            if op == "add":
+                ips.add(value)
+            else:
+                ips.discard(value)
+    elif message.get("type") == "domain":
+        domains = domains | frozenset(values) if op == "add" else domains - frozenset(values)
+    return ips, domains
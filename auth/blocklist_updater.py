@@ -1,29 +1,44 @@
 import asyncio
+import logging
+from auth import blocklist_cache
 from auth.database import SessionLocal
-from auth.blocklist_cache import blocked_ips, blocked_domains
+from DLL.pubsub import event_bus
 from users.models import BlocklistEntry
 
+logger = logging.getLogger(__name__)
 
-async def refresh_blocklist_periodically(interval: int = 60):
-    while True:
-        try:
-            db = SessionLocal()
-            entries = db.query(BlocklistEntry).all()
 
-            # Clear old sets
-            blocked_ips.clear()
-            blocked_domains.clear()
+def load_blocklist():
+    db = SessionLocal()
+    try:
+        entries = db.query(BlocklistEntry).all()
+        ips = [entry.value for entry in entries if entry.type == "ip" and entry.value]
+        domains = [entry.value for entry in entries if entry.type == "domain" and entry.value]
+        return ips, domains
+    finally:
+        db.close()
 
-            for entry in entries:
-                if entry.type == "ip" and entry.value:
-                    blocked_ips.add(entry.value)
-                elif entry.type == "domain" and entry.value:
-                    blocked_domains.add(entry.value)
 
+async def refresh_blocklist_periodically(interval: int = 600):
+    # Changes normally arrive as deltas on BLOCKLIST_CHANNEL; this full reload is only a fallback
+    while True:
+        blocklist_cache.begin_resync()
+        try:
+            ips, domains = await asyncio.to_thread(load_blocklist)
+            blocklist_cache.replace_blocklist(ips, domains)
             print("✅ Blocklist refreshed")
         except Exception as e:
+            blocklist_cache.cancel_resync()
             print("❌ Error refreshing blocklist:", e)
-        finally:
-            db.close()
 
         await asyncio.sleep(interval)
+
+
+async def publish_blocklist_change(op: str, entry_type: str, values: list):
+    message = {"op": op, "type": entry_type, "values": values}
+    # Apply here right away; other workers get it from the event bus
+    blocklist_cache.apply_blocklist_delta(message)
+    try:
+        await event_bus.publish(blocklist_cache.BLOCKLIST_CHANNEL, message)
+    except Exception as e:
+        logger.warning(f"Could not publish blocklist change: {e}")
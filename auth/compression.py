@@ -0,0 +1,146 @@
+import os
+import zlib
+from typing import List, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from DLL.cache_codec import accepts_encoding
+
+try:
+    import brotli
+except ImportError:  # Optional, gzip only when it is not installed
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+    "image/svg+xml",
+    "text/",
+)
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        # wbits 31: gzip container, same as gzip.compress
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """gzip/brotli response compression as raw ASGI.
+
+    Only bodies of at least ``min_size`` bytes with a content type from
+    ``content_types`` are compressed. Responses that already carry a
+    Content-Encoding (such as compressed cache entries from the proxy), partial
+    206 responses and server-sent events pass through untouched; streamed
+    bodies are compressed chunk by chunk. A compressed response drops
+    Accept-Ranges and gets a weak ETag.
+    """
+
+    def __init__(self, app: ASGIApp, min_size: int = COMPRESS_MIN_BYTES,
+                 content_types: Tuple[str, ...] = COMPRESSIBLE_TYPES):
+        self.app = app
+        self.min_size = min_size
+        self.content_types = content_types
+
+    def _encoding(self, scope: Scope) -> Optional[str]:
+        accept_encoding = Headers(scope=scope).get("accept-encoding")
+        if brotli is not None and accepts_encoding(accept_encoding, "br"):
+            return "br"
+        if accepts_encoding(accept_encoding, "gzip"):
+            return "gzip"
+        return None
+
+    def _compressible(self, headers: Headers) -> bool:
+        # Content-Range offsets describe the identity body, so partial responses stay as they are
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith("text/event-stream"):
+            return False
+        return content_type.startswith(self.content_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if status < 200 or status in (204, 206, 304) or not self._compressible(Headers(raw=message["headers"])):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk tells whether compressing is worth it
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.min_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Brotli(COMPRESS_BROTLI_QUALITY) if encoding == "br" else _Gzip(COMPRESS_GZIP_LEVEL)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+                if "accept-ranges" in headers:
+                    del headers["Accept-Ranges"]
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                if not more_body:
+                    compressed = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(compressed))
+                    start["headers"] = headers.raw
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                start["headers"] = headers.raw
+                await send(start)
+
+            chunks: List[bytes] = [compressor.compress(body)] if body else []
+            if not more_body:
+                chunks.append(compressor.finish())
+            await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
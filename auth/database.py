@@ -1,14 +1,53 @@
 import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 load_dotenv()
 DATABASE_URL = os.getenv("DB_CONNECTIVITY")
 
-engine = create_engine(DATABASE_URL)
+# libpq query parameters asyncpg has its own name for; other libpq-only ones are dropped,
+# since SQLAlchemy hands the query string to asyncpg.connect as keyword arguments
+ASYNCPG_RENAMED_PARAMS = {"sslmode": "ssl"}
+LIBPQ_ONLY_PARAMS = {
+    "application_name", "channel_binding", "connect_timeout", "gssencmode", "keepalives", "keepalives_count",
+    "keepalives_idle", "keepalives_interval", "options", "sslcert", "sslcrl", "sslkey",
+    "sslpassword", "sslrootcert", "target_session_attrs",
+}
+
+
+def asyncpg_url(database_url: str):
+    """DB_CONNECTIVITY rewritten for asyncpg, e.g. ``?sslmode=require`` becomes ``?ssl=require``."""
+    url = make_url(database_url)
+    query = {}
+    for name, value in url.query.items():
+        if name in LIBPQ_ONLY_PARAMS:
+            continue
+        query[ASYNCPG_RENAMED_PARAMS.get(name, name)] = value
+    return url.set(drivername="postgresql+asyncpg", query=query)
+
+
+# Same database through asyncpg for the request path; derived from DB_CONNECTIVITY when not set
+ASYNC_DATABASE_URL = os.getenv("DB_ASYNC_CONNECTIVITY") or asyncpg_url(DATABASE_URL)
+
+# Pool sizing applies per engine and per worker process
+pool_options = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    "pool_pre_ping": True,
+}
+
+engine = create_engine(DATABASE_URL, **pool_options)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
@@ -3,11 +3,13 @@ from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 import httpx
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from .utils import ALGORITHM, SECRET_KEY, SUPERLOGIN_ALGORITHM, SUPERLOGIN_API_KEY, SUPERLOGIN_SECRET_KEY, verify_password, get_password_hash, create_access_token
 from .models import TokenData
+from .principal_cache import Principal, principal_cache
 from users.models import APIRoute, Channel, Role, User, UserChannel, UserRole
-from .database import SessionLocal, engine
+from .database import AsyncSessionLocal, SessionLocal, engine
 from users import models
 from sqlalchemy import select
 from logger import log_info, log_error
@@ -24,6 +26,10 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def get_user(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
@@ -64,8 +70,8 @@ def get_user_role(db: Session, user_id: int, client_ip="unknown", host="unknown"
         log_error(client_ip, host, "/get_user_role", token, error_message)
         raise HTTPException(status_code=e.response.status_code, detail=error_message)
     
-def get_current_user(request: Request,
-    db: Session = Depends(get_db),
+async def get_current_user(request: Request,
+    db: AsyncSession = Depends(get_async_db),
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
 ):
     client_ip = request.client.host
@@ -87,50 +93,60 @@ def get_current_user(request: Request,
     except JWTError:
         log_error(client_ip, host, "/get_current_user", token, "Invalid token")
         raise credentials_exception
-    user = get_user(db, email=token_data.username)
+    user = principal_cache.get(token_data.username)
     if user is None:
-        raise credentials_exception
-    
-    try:
-        user_channels = (
-            db.query(Channel.name)
-            .join(UserChannel, Channel.id == UserChannel.channel_id)
-            .filter(UserChannel.user_id == user.id)
-            .all()
-        )
-        channels = [channel.name for channel in user_channels]
-        user.channels = channels
-    except Exception as e:
-        log_error(client_ip, host, "/get_current_user", token, f"Error fetching user channels: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to fetch user channels")
-    
-    try:
-        user_role = (
-            db.query(Role.name)
-            .join(UserRole, Role.id == UserRole.role_id)
-            .filter(UserRole.user_id == user.id)
-            .all()
-        )
-        roles = [role.name for role in user_role]
-        user.role = roles
-    except Exception as e:
-        log_error(client_ip, host, "/get_current_user", token, f"Error fetching user roles: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to fetch user roles")
+        try:
+            user = await load_principal(db, token_data.username)
+        except Exception as e:
+            log_error(client_ip, host, "/get_current_user", token, f"Error fetching user principal: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to fetch user channels and roles")
+        if user is None:
+            raise credentials_exception
+        principal_cache.put(token_data.username, user)
 
     return user
 
+async def load_principal(db: AsyncSession, email: str):
+    """Load the user with its channels and roles in a single joined query."""
+    query = (
+        select(User.id, User.email, User.status, Channel.name, Role.name)
+        .outerjoin(UserChannel, UserChannel.user_id == User.id)
+        .outerjoin(Channel, Channel.id == UserChannel.channel_id)
+        .outerjoin(UserRole, UserRole.user_id == User.id)
+        .outerjoin(Role, Role.id == UserRole.role_id)
+        .where(User.email == email)
+    )
+    rows = (await db.execute(query)).all()
+    if not rows:
+        return None
+    user_id, user_email, user_status = rows[0][0], rows[0][1], rows[0][2]
+    # dict.fromkeys de-duplicates the channel x role product while keeping order
+    channels = list(dict.fromkeys(row[3] for row in rows if row[3] is not None))
+    roles = list(dict.fromkeys(row[4] for row in rows if row[4] is not None))
+    status = user_status.value if hasattr(user_status, "value") else user_status
+    return Principal(user_id, user_email, status, channels, roles)
+
+def channel_to_dict(channel: Channel) -> dict:
+    return {
+        "name": channel.name,
+        "BaseUrl": channel.base_url,
+        "AuthUrl": channel.auth_url,
+        "ApiKey": channel.api_key,
+        "Http2": channel.http2,
+        "MaxConnections": channel.max_connections,
+        "MaxKeepaliveConnections": channel.max_keepalive_connections,
+        "KeepaliveExpiry": channel.keepalive_expiry,
+        "ConnectTimeout": channel.connect_timeout,
+        "ReadTimeout": channel.read_timeout,
+        "RateLimitCalls": channel.rate_limit_calls,
+        "RateLimitPeriod": channel.rate_limit_period,
+    }
+
 def fetch_channel_data(channel_name: str, db: Session = Depends(get_db)):
-    query = select(Channel.name, Channel.base_url, Channel.auth_url, Channel.api_key).where(Channel.name == channel_name)  
-    result = db.execute(query)
-    channel = result.fetchone() 
+    query = select(Channel).where(Channel.name == channel_name)
+    channel = db.execute(query).scalars().first()
     if channel:
-        name, base_url, auth_url, api_key = channel
-        return {
-            "name": name,
-            "BaseUrl": base_url,
-            "AuthUrl": auth_url,
-            "ApiKey": api_key
-        }
+        return channel_to_dict(channel)
     return {"error": "Channel not found"}
 
 def fetch_urls(db: Session = Depends(get_db)):
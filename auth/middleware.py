@@ -1,15 +1,14 @@
 from datetime import datetime
 import logging
-from logging.handlers import RotatingFileHandler
 import os
-import time
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
 import pytz
+from auth.asgi_middleware import AccessLogMiddleware
+from auth.compression import CompressionMiddleware
 from auth.dependencies import validate_token
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from logger import log_error, log_info
+from logger import BatchingRotatingFileHandler, JsonLogFormatter, attach_queue_logging, log_error, log_info
 
 logger = logging.getLogger('uvicorn.access')
 logger.disabled = False
@@ -29,82 +28,20 @@ def ApiGateway_Middleware(app:FastAPI):
     current_time = datetime.now(paris_tz).strftime("%Y-%m-%d_%H-%M-%S")
     Middlelog_file_name = os.path.join(logs_dir, f"{current_time}.log")
     
-    log_formatter = logging.Formatter(
-        "%(log_type)s: %(asctime)s - IP: %(client_ip)s - Domain: %(host)s - URL: %(url)s - Token: %(token)s - Method: %(method)s - LogMessage: %(log_message)s ."
-    )
-    log_formatter.converter = paris_time
-    log_handler = RotatingFileHandler(
-        Middlelog_file_name, maxBytes=10 * 1024 * 1024, backupCount=5
+    log_formatter = JsonLogFormatter()
+    log_handler = BatchingRotatingFileHandler(
+        Middlelog_file_name, maxBytes=10 * 1024 * 1024, backupCount=5, index=True
     )
     log_handler.setFormatter(log_formatter)
     logger = logging.getLogger("api_gateway_logger")
     logger.setLevel(logging.INFO)
-    logger.addHandler(log_handler)
+    # File writes happen on the log listener thread, never on the event loop
+    attach_queue_logging(logger, log_handler)
     
-    @app.middleware('http')
-
-    async def custom_logging(request: Request, call_next):
-        if request.url.path.startswith("/logs/apilogs/"):
-            return await call_next(request)
-        start_time = time.time()
-        client_ip = request.client.host
-        domain = request.headers.get("host", "unknown")
-        
-        token = request.headers.get("Authorization", "none")
-        
-        if not token:
-            return JSONResponse(status_code=401, content={"detail": "Not authenticated"})
-        url = str(request.url)
-        method = request.method
-
-        incoming_log_data = {
-            "log_type": "INCOMING",
-            "client_ip": client_ip,
-            "host": domain,
-            "url": url,
-            "token": token,
-            "method": method,
-            "log_message": "Incoming request received",
-        }
-        logger.info("Incoming request log", extra=incoming_log_data)
-
-        print(incoming_log_data)
-        try:
-            response = await call_next(request)
-            processed_time = time.time() - start_time
-            outgoing_log_data = {
-                "log_type": "OUTGOING",
-                "client_ip": client_ip,
-                "host": domain,
-                "url": url,
-                "token": token,
-                "method": method,
-                "status_code": response.status_code,
-                "processed_time": f"{processed_time:.2f}s",
-                "log_message": "Outgoing response sent",
-            }
-            logger.info("Outgoing request log", extra=outgoing_log_data) 
-            print(outgoing_log_data)
-            return response
-        
-        except Exception as e:
-            processed_time = time.time() - start_time
-            error_log_data = {
-            "log_type": "ERROR",
-            "client_ip": client_ip,
-            "host": domain,
-            "url": url,
-            "token": token,
-            "method": method,
-            "processed_time": f"{processed_time:.2f}s",
-            "error": str(e),
-            "log_message": "Error occurred while processing request",
-            }
-            logger.error("Error while processing request", extra=error_log_data)
-            return JSONResponse(
-                status_code=500,
-                content={"detail": "An internal server error occurred."},
-            )     
+    # Innermost, so compressed sizes are what leaves the gateway
+    app.add_middleware(CompressionMiddleware)
+    # Pure ASGI: no per-request task or streaming-body wrapper like @app.middleware('http')
+    app.add_middleware(AccessLogMiddleware, logger=logger)
 
     app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"],allow_credentials= True,)
     app.add_middleware(TrustedHostMiddleware,  allowed_hosts=["centeralisedmiddleware.onrender.com","mpp-gateway-ewpuz.ondigitalocean.app","127.0.0.1", "localhost", "*.yourdomain.com"],)
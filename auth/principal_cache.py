@@ -0,0 +1,89 @@
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from DLL.pubsub import event_bus
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CHANNEL = "gateway:principal"
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 30))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+
+
+class Principal:
+    """The authenticated user as seen by request handlers: identity, channels and roles."""
+
+    __slots__ = ("id", "email", "status", "channels", "role")
+
+    def __init__(self, id: int, email: str, status: str, channels: List[str], role: List[str]):
+        self.id = id
+        self.email = email
+        self.status = status
+        self.channels = channels
+        self.role = role
+
+    def __repr__(self):
+        return f"<Principal(id={self.id}, email={self.email}, channels={self.channels}, role={self.role})>"
+
+
+class PrincipalCache:
+    """Short-lived cache of principals keyed by the token subject (email)."""
+
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL, max_entries: int = PRINCIPAL_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, Principal]] = {}
+        self._subjects: Dict[int, str] = {}
+
+    def get(self, subject: str) -> Optional[Principal]:
+        entry = self._entries.get(subject)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            self._drop(subject)
+            return None
+        return principal
+
+    def put(self, subject: str, principal: Principal):
+        if self.ttl <= 0:
+            return
+        if subject not in self._entries and len(self._entries) >= self.max_entries:
+            # Dicts keep insertion order, so this drops the oldest entry
+            self._drop(next(iter(self._entries)))
+        self._entries[subject] = (time.monotonic() + self.ttl, principal)
+        self._subjects[principal.id] = subject
+
+    def invalidate_user(self, user_id: int):
+        subject = self._subjects.pop(user_id, None)
+        if subject is not None:
+            self._entries.pop(subject, None)
+
+    def on_change(self, message: dict):
+        user_id = message.get("user_id")
+        if user_id is None:
+            self.clear()
+        else:
+            self.invalidate_user(int(user_id))
+
+    def clear(self):
+        self._entries.clear()
+        self._subjects.clear()
+
+    def _drop(self, subject: str):
+        entry = self._entries.pop(subject, None)
+        if entry is not None:
+            self._subjects.pop(entry[1].id, None)
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_principal(user_id: int):
+    """Drop a user's cached principal here and on every other worker."""
+    principal_cache.invalidate_user(user_id)
+    try:
+        event_bus.publish_sync(PRINCIPAL_CHANNEL, {"user_id": user_id})
+    except Exception as e:
+        logger.warning(f"Could not publish principal invalidation for user {user_id}: {e}")
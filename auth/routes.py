@@ -5,6 +5,7 @@ from sqlalchemy import Select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from DLL.schemas import ShowBlockedResponse
+from auth.blocklist_updater import publish_blocklist_change
 from auth.middleware import admin_only
 from logger import log_error, log_info
 from .dependencies import get_channel_by_name, get_db, authenticate_user, create_access_token, get_user, get_user_channel, get_user_role
@@ -107,19 +108,27 @@ def signup(request: Request, user: UserCreate, db: Session = Depends(get_db)):
 
 @router.post("/blocklist")
 async def update_blocklist(data: BlockRequest, db: Session = Depends(get_db)):
+    added_ips, added_domains = [], []
     # Store blocked IPs
     for ip in data.blocked_ips:
         if not db.query(BlocklistEntry).filter_by(value=ip, type="ip").first():
             entry = BlocklistEntry(type="ip", value=ip)
             db.add(entry)
+            added_ips.append(ip)
 
     # Store blocked Domains
     for domain in data.blocked_domains:
         if not db.query(BlocklistEntry).filter_by(value=domain, type="domain").first():
             entry = BlocklistEntry(type="domain", value=domain)
             db.add(entry)
+            added_domains.append(domain)
 
     db.commit()
+    # Push the new entries to every worker instead of waiting for the next full reload
+    if added_ips:
+        await publish_blocklist_change("add", "ip", added_ips)
+    if added_domains:
+        await publish_blocklist_change("add", "domain", added_domains)
     return {"message": "Blocklist updated successfully"}
 
 @router.get("/showblocked")
@@ -138,7 +147,7 @@ async def get_blocklist(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Internal server error")
     
 @router.delete("/remove/{id}")
-def deleteBlockList(id: int, db: Session =Depends(get_db)):
+async def deleteBlockList(id: int, db: Session =Depends(get_db)):
     try:
         print("deleteing stars")
         blocklist = db.query(BlocklistEntry).filter(BlocklistEntry.id == id).first()
@@ -146,8 +155,11 @@ def deleteBlockList(id: int, db: Session =Depends(get_db)):
         if not blocklist:
             raise HTTPException(status_code=404, detail="Blocked IP or Domain not found")
 
+        entry_type, value = blocklist.type, blocklist.value
         db.delete(blocklist)
         db.commit()
+        # Applied on the event loop, like additions, never from a threadpool worker
+        await publish_blocklist_change("remove", getattr(entry_type, "value", entry_type), [value])
 
         return {"message": f"BlockList with ID {id} deleted successfully"}
 
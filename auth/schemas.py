@@ -38,6 +38,9 @@ class LogFilesResponse(BaseModel):
     message: str
     result: bool
     data: List[LogFile]
+    total: Optional[int] = None
+    page: Optional[int] = None
+    page_size: Optional[int] = None
     
 class BlockRequest(BaseModel):
     blocked_ips: List[str]
@@ -0,0 +1,125 @@
+"""Per-request overhead of the gateway middleware stack, old vs new.
+
+Drives both stacks in-process through ASGI (no sockets, no uvicorn) against a
+trivial endpoint, so the difference is the middleware cost only.
+
+    python -m benchmarks.middleware_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from auth import blocklist_cache
+from auth.asgi_middleware import AccessLogMiddleware, GatewayGateMiddleware
+
+bench_logger = logging.getLogger("middleware_bench")
+bench_logger.addHandler(logging.NullHandler())
+bench_logger.propagate = False
+
+
+async def ping(request):
+    return PlainTextResponse("pong")
+
+
+def make_app() -> Starlette:
+    return Starlette(routes=[Route("/ping", ping)])
+
+
+# The BaseHTTPMiddleware stack main.py used before, minus the per-request DB query
+class LegacyIPBlockMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        client_ip = request.headers.get("X-Forwarded-For") or request.client.host
+        if client_ip in blocklist_cache.blocked_ips.entries:
+            return Response("Access Denied: IP blocked", status_code=403)
+        return await call_next(request)
+
+
+class LegacyDomainBlockMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        domain_only = request.headers.get("host", "").split(":")[0].lower()
+        if domain_only in blocklist_cache.blocked_domains:
+            return Response("Access Denied: Domain blocked", status_code=403)
+        return await call_next(request)
+
+
+def legacy_app() -> Starlette:
+    app = make_app()
+
+    @app.middleware("http")
+    async def custom_logging(request: Request, call_next):
+        data = {"client_ip": request.client.host, "url": str(request.url), "method": request.method}
+        bench_logger.info("Incoming request log", extra=data)
+        print(data)
+        response = await call_next(request)
+        bench_logger.info("Outgoing request log", extra={**data, "status_code": response.status_code})
+        print(data)
+        return response
+
+    app.add_middleware(LegacyIPBlockMiddleware)
+    app.add_middleware(LegacyDomainBlockMiddleware)
+    return app
+
+
+def asgi_app() -> Starlette:
+    app = make_app()
+    app.add_middleware(AccessLogMiddleware, logger=bench_logger)
+    app.add_middleware(GatewayGateMiddleware)
+    return app
+
+
+async def run(app, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"x-forwarded-for", b"203.0.113.9")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(min(1000, requests)):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    blocklist_cache.replace_blocklist(["198.51.100.0/24", "192.0.2.1"], ["blocked.example"])
+    # The legacy stack print()s per request; keep that cost but not the terminal output
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        baseline = asyncio.run(run(make_app(), args.requests))
+        legacy = asyncio.run(run(legacy_app(), args.requests))
+        pure = asyncio.run(run(asgi_app(), args.requests))
+
+    print(f"no middleware      {baseline * 1e6:8.1f} us/request")
+    print(f"BaseHTTPMiddleware {legacy * 1e6:8.1f} us/request (+{(legacy - baseline) * 1e6:.1f} us)")
+    print(f"pure ASGI          {pure * 1e6:8.1f} us/request (+{(pure - baseline) * 1e6:.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
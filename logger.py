@@ -1,8 +1,14 @@
+import atexit
+from contextvars import ContextVar
 from datetime import datetime
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+import queue
+import time
 import pytz
+from logs.manifest import log_manifest
 
 paris_tz = pytz.timezone('Europe/Paris')
 
@@ -11,6 +17,248 @@ def paris_time(*args):
 
 IS_PRODUCTION = os.getenv("IS_PRODUCTION", "false").lower() == "true"
 
+# Async log pipeline: handlers enqueue, one thread per logger writes to disk in batches
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_QUEUE_POLICY = os.getenv("LOG_QUEUE_POLICY", "drop").lower()  # "drop" or "block"
+LOG_QUEUE_BLOCK_TIMEOUT = float(os.getenv("LOG_QUEUE_BLOCK_TIMEOUT", 0.05))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", 256))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 0.5))
+
+_FLUSH_TIMEOUT = object()
+_log_pipelines = {}
+
+# Set by the access log middleware so every record of a request carries its id
+request_id_var: ContextVar = ContextVar("request_id", default=None)
+
+LOG_FIELDS = (
+    "log_type", "request_id", "client_ip", "host", "method", "url", "channel",
+    "status_code", "processed_time", "token", "error", "log_message",
+)
+# Sidecar index: record field -> key in the index block
+INDEXED_FIELDS = (("status", "status_code"), ("channel", "channel"), ("ip", "client_ip"), ("rid", "request_id"))
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per line (ndjson), with only the fields the record carries."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, paris_tz).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+        }
+        for field in LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that writes through the stream buffer and lets the
+    queue listener decide when to flush, so a batch of records costs one write.
+
+    The stock shouldRollover() seeks to the end of the file for every record,
+    which flushes the buffer each time; the size is tracked here instead.
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding=None, index=False):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding)
+        self._size = os.path.getsize(self.baseFilename) if os.path.exists(self.baseFilename) else 0
+        # With index=True every flushed batch appends one line to "<file>.idx" describing the
+        # byte range it occupies: time range plus the statuses, channels, IPs and request ids in it
+        self.index = index
+        self._block = None
+        log_manifest.note_file(self.baseFilename, self._size)
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            if self.maxBytes > 0 and self._size and self._size + len(msg) >= self.maxBytes:
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            offset = self._size
+            self.stream.write(msg)
+            self._size += len(msg)
+            if self.index:
+                self._index_record(record, offset)
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self):
+        if self.stream is not None:
+            self.stream.flush()
+        self._write_index_block()
+        super().doRollover()
+        if self.index:
+            self._rotate_index()
+        self._size = 0
+        # The base name now points at a fresh file
+        log_manifest.remove(self.baseFilename)
+        log_manifest.note_file(self.baseFilename, 0)
+
+    def flush(self):
+        # Flushing happens per batch in flush_batch(); close() still flushes the stream
+        pass
+
+    def flush_batch(self):
+        self.acquire()
+        try:
+            super().flush()
+            self._write_index_block()
+            log_manifest.note_file(self.baseFilename, self._size)
+        finally:
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            if self.stream is not None:
+                self.stream.flush()
+            self._write_index_block()
+        finally:
+            self.release()
+        super().close()
+
+    def _index_record(self, record, offset):
+        block = self._block
+        if block is None:
+            block = self._block = {"start": offset, "count": 0, "ts_min": record.created, "ts_max": record.created}
+            for key, _ in INDEXED_FIELDS:
+                block[key] = set()
+        block["count"] += 1
+        block["ts_min"] = min(block["ts_min"], record.created)
+        block["ts_max"] = max(block["ts_max"], record.created)
+        for key, field in INDEXED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                block[key].add(value)
+
+    def _write_index_block(self):
+        block, self._block = self._block, None
+        if block is None:
+            return
+        block["end"] = self._size
+        for key, _ in INDEXED_FIELDS:
+            block[key] = sorted(block[key], key=str)
+        try:
+            with open(self.baseFilename + ".idx", "a", encoding="utf-8") as index_file:
+                index_file.write(json.dumps(block, default=str, separators=(",", ":")) + "\n")
+        except OSError:
+            pass
+
+    def _rotate_index(self):
+        # Mirror RotatingFileHandler's renames so "<file>.N.idx" keeps describing "<file>.N"
+        base = self.baseFilename
+        if self.backupCount <= 0:
+            if os.path.exists(base + ".idx"):
+                os.remove(base + ".idx")
+            return
+        for i in range(self.backupCount - 1, 0, -1):
+            sfn = self.rotation_filename(f"{base}.{i}") + ".idx"
+            dfn = self.rotation_filename(f"{base}.{i + 1}") + ".idx"
+            if os.path.exists(sfn):
+                if os.path.exists(dfn):
+                    os.remove(dfn)
+                os.rename(sfn, dfn)
+        dfn = self.rotation_filename(f"{base}.1") + ".idx"
+        if os.path.exists(dfn):
+            os.remove(dfn)
+        if os.path.exists(base + ".idx"):
+            os.rename(base + ".idx", dfn)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler over a bounded queue that drops (or briefly blocks) when full."""
+
+    def __init__(self, log_queue: queue.Queue, policy: str = LOG_QUEUE_POLICY, block_timeout: float = LOG_QUEUE_BLOCK_TIMEOUT):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.enqueued = 0
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener(QueueListener):
+    """Writes queued records and flushes the handlers every batch_size records or flush_interval seconds."""
+
+    def __init__(self, log_queue: queue.Queue, *handlers, batch_size: int = LOG_BATCH_SIZE, flush_interval: float = LOG_FLUSH_INTERVAL):
+        super().__init__(log_queue, *handlers)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    def enqueue_sentinel(self):
+        # Block rather than fail when the queue is full at shutdown
+        self.queue.put(self._sentinel)
+
+    def _monitor(self):
+        q = self.queue
+        pending = 0
+        deadline = 0.0
+        while True:
+            try:
+                timeout = max(0.0, deadline - time.monotonic()) if pending else None
+                record = q.get(True, timeout)
+            except queue.Empty:
+                record = _FLUSH_TIMEOUT
+            if record is self._sentinel:
+                self._flush()
+                q.task_done()
+                break
+            if record is not _FLUSH_TIMEOUT:
+                if not pending:
+                    deadline = time.monotonic() + self.flush_interval
+                self.handle(record)
+                pending += 1
+                q.task_done()
+            if pending and (pending >= self.batch_size or time.monotonic() >= deadline):
+                self._flush()
+                pending = 0
+
+    def _flush(self):
+        for handler in self.handlers:
+            try:
+                getattr(handler, "flush_batch", handler.flush)()
+            except Exception:
+                pass
+
+
+def attach_queue_logging(target: logging.Logger, *handlers: logging.Handler) -> BoundedQueueHandler:
+    """Route a logger through a bounded queue to handlers running on a background thread."""
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = BoundedQueueHandler(log_queue)
+    listener = BatchingQueueListener(log_queue, *handlers)
+    target.addHandler(queue_handler)
+    # Otherwise every record is also written synchronously by the root logger's stderr handler
+    target.propagate = False
+    listener.start()
+    atexit.register(listener.stop)
+    _log_pipelines[target.name] = queue_handler
+    return queue_handler
+
+
+def get_log_pipeline_stats() -> dict:
+    return {
+        name: {
+            "policy": handler.policy,
+            "queued": handler.queue.qsize(),
+            "capacity": handler.queue.maxsize,
+            "enqueued": handler.enqueued,
+            "dropped": handler.dropped,
+        }
+        for name, handler in _log_pipelines.items()
+    }
+
 if IS_PRODUCTION:
     os.makedirs("/tmp/logs", exist_ok=True)
     log_file_name = "/tmp/logs/app.log"
@@ -21,25 +269,23 @@ else:
     log_file_name = os.path.join(logs_dir, f"{current_time}.log")
 
 
-log_formatter = logging.Formatter(
-    "%(log_type)s: %(asctime)s - IP: %(client_ip)s - Domain: %(host)s - URL: %(url)s - Token: %(token)s - LogMessage: %(log_message)s ."
-)
-log_formatter.converter = paris_time
+log_formatter = JsonLogFormatter()
 
-log_handler = RotatingFileHandler(
-    log_file_name, maxBytes=10 * 1024 * 1024, backupCount=5
+log_handler = BatchingRotatingFileHandler(
+    log_file_name, maxBytes=10 * 1024 * 1024, backupCount=5, index=True
 )
 
 log_handler.setFormatter(log_formatter)
 logger = logging.getLogger("apps_logger")
 logger.setLevel(logging.INFO)
-logger.addHandler(log_handler)
+attach_queue_logging(logger, log_handler)
 
 
 # Logging utility functions
 def log_info(client_ip="unknown", host="unknown", url="unknown", token="none", message=""):
     log_data = {
         "log_type": "Info",
+        "request_id": request_id_var.get(),
         "client_ip": client_ip,
         "host": host,
         "url": url,
@@ -52,6 +298,7 @@ def log_info(client_ip="unknown", host="unknown", url="unknown", token="none", m
 def log_error(client_ip="unknown", host="unknown", url="unknown", token="none", message=""):
     log_data = {
         "log_type": "Error",
+        "request_id": request_id_var.get(),
         "client_ip": client_ip,
         "host": host,
         "url": url,
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+LOG_MANIFEST_RESCAN = float(os.getenv("LOG_MANIFEST_RESCAN", 30))
+SORT_KEYS = ("created_at", "size", "filename")
+
+
+class LogManifest:
+    """In-memory list of ``*.log`` files per directory.
+
+    Our own file handlers report files as they open, grow and rotate them, so
+    listing never has to glob and stat a whole directory. Files written by other
+    processes are picked up by a rescan, at most every ``rescan_interval``
+    seconds and only when the directory's mtime moved. Sorted views are cached
+    until the set of files changes, so a listing costs O(page).
+    """
+
+    def __init__(self, suffix: str = ".log", rescan_interval: float = LOG_MANIFEST_RESCAN):
+        self.suffix = suffix
+        self.rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, dict]] = {}
+        self._views: Dict[Tuple[str, str, bool], List[dict]] = {}
+        self._scans: Dict[str, Tuple[int, float]] = {}
+
+    def note_file(self, path: str, size: Optional[int] = None):
+        """Record that ``path`` was created or written to; called from the log handlers."""
+        folder, name = os.path.split(os.path.abspath(path))
+        if not name.endswith(self.suffix):
+            return
+        with self._lock:
+            entries = self._files.get(folder)
+            if entries is None:
+                # Directory not listed yet; the first listing will scan it
+                return
+            entry = entries.get(name)
+            if entry is None:
+                entry = self._stat(folder, name)
+                if entry is None:
+                    return
+                entries[name] = entry
+                self._drop_views(folder)
+            elif size is not None and size != entry["size"]:
+                entry["size"] = size
+                self._drop_views(folder, "size")
+
+    def remove(self, path: str):
+        folder, name = os.path.split(os.path.abspath(path))
+        with self._lock:
+            if self._files.get(folder, {}).pop(name, None) is not None:
+                self._drop_views(folder)
+
+    def page(self, folder: str, page: int = 1, page_size: int = 50,
+             sort: str = "created_at", descending: bool = True) -> Tuple[int, List[dict]]:
+        folder = os.path.abspath(folder)
+        self._ensure_scanned(folder)
+        with self._lock:
+            view = self._views.get((folder, sort, descending))
+            if view is None:
+                view = sorted(self._files.get(folder, {}).values(), key=lambda e: e[sort], reverse=descending)
+                self._views[(folder, sort, descending)] = view
+            total = len(view)
+            start = (page - 1) * page_size
+            window = view[start:start + page_size]
+
+        # Only the files on this page are stat'ed, so sizes grown by other workers stay current
+        items = []
+        for entry in window:
+            try:
+                entry["size"] = os.stat(os.path.join(folder, entry["filename"])).st_size
+            except FileNotFoundError:
+                self.remove(os.path.join(folder, entry["filename"]))
+                continue
+            items.append(dict(entry))
+        return total, items
+
+    def _ensure_scanned(self, folder: str):
+        now = time.monotonic()
+        scan = self._scans.get(folder)
+        if scan is not None and now - scan[1] < self.rescan_interval:
+            return
+        mtime = os.stat(folder).st_mtime_ns
+        if scan is not None and scan[0] == mtime and folder in self._files:
+            self._scans[folder] = (mtime, now)
+            return
+        entries = {}
+        with os.scandir(folder) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(self.suffix) and dir_entry.is_file():
+                    stat = dir_entry.stat()
+                    entries[dir_entry.name] = self._entry(dir_entry.name, stat)
+        with self._lock:
+            self._files[folder] = entries
+            self._drop_views(folder)
+            self._scans[folder] = (mtime, now)
+
+    def _stat(self, folder: str, name: str) -> Optional[dict]:
+        try:
+            return self._entry(name, os.stat(os.path.join(folder, name)))
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _entry(name: str, stat: os.stat_result) -> dict:
+        return {"filename": name, "size": stat.st_size, "created_at": datetime.fromtimestamp(stat.st_ctime)}
+
+    def _drop_views(self, folder: str, sort: Optional[str] = None):
+        for key in [key for key in self._views if key[0] == folder and (sort is None or key[1] == sort)]:
+            del self._views[key]
+
+
+log_manifest = LogManifest()
@@ -0,0 +1,78 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, Optional
+from fastapi import Request
+
+CHUNK_SIZE = 64 * 1024
+FOLLOW_POLL_INTERVAL = 1.0
+FOLLOW_HEARTBEAT = 15.0
+FOLLOW_MAX_READ = 1024 * 1024
+
+
+def iter_line_window(log_path: Path, offset: int = 0, limit: Optional[int] = None) -> Iterator[bytes]:
+    """Yield lines [offset, offset + limit) while holding one line in memory at a time."""
+    with log_path.open("rb") as log_file:
+        for number, line in enumerate(log_file):
+            if number < offset:
+                continue
+            if limit is not None and number >= offset + limit:
+                break
+            yield line
+
+
+def read_tail(log_path: Path, count: int) -> List[bytes]:
+    """Last ``count`` lines, reading the file backwards in chunks."""
+    with log_path.open("rb") as log_file:
+        log_file.seek(0, os.SEEK_END)
+        position = log_file.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= count:
+            read_size = min(CHUNK_SIZE, position)
+            position -= read_size
+            log_file.seek(position)
+            data = log_file.read(read_size) + data
+    return data.splitlines(keepends=True)[-count:]
+
+
+def _sse(line: bytes) -> bytes:
+    return b"data: " + line.rstrip(b"\r\n") + b"\n\n"
+
+
+async def follow_log(request: Request, log_path: Path, tail: int = 0) -> AsyncIterator[bytes]:
+    """Server-sent events with the last ``tail`` lines, then each new line as it is written.
+
+    Only bytes appended since the previous poll are read. A file that shrinks
+    (rotated or truncated) is followed again from its start.
+    """
+    if tail:
+        for line in await asyncio.to_thread(read_tail, log_path, tail):
+            yield _sse(line)
+
+    position = log_path.stat().st_size if log_path.exists() else 0
+    pending = b""
+    idle = 0.0
+    while not await request.is_disconnected():
+        try:
+            size = log_path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size < position:
+            position, pending = 0, b""
+        if size > position:
+            with log_path.open("rb") as log_file:
+                log_file.seek(position)
+                chunk = log_file.read(min(size - position, FOLLOW_MAX_READ))
+            position += len(chunk)
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                yield _sse(line)
+            idle = 0.0
+            if size > position:
+                continue
+        elif idle >= FOLLOW_HEARTBEAT:
+            yield b": keep-alive\n\n"
+            idle = 0.0
+        await asyncio.sleep(FOLLOW_POLL_INTERVAL)
+        idle += FOLLOW_POLL_INTERVAL
@@ -1,9 +1,15 @@
+import asyncio
 from datetime import datetime
 import os
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
 from pathlib import Path
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from auth.schemas import LogFilesResponse 
+from logger import get_log_pipeline_stats
+from logs.manifest import log_manifest
+from logs.reader import follow_log, iter_line_window, read_tail
+from logs.search import LogQuery, search_logs
 
 router = APIRouter()
 
@@ -18,8 +24,67 @@ else:
     BASE_LOG_DIR = (Path(__file__).parent / "static").resolve()
     ALLOWED_DIRS = {"applogs", "middlewarelogs"}
 
+# Queue depth and drop counters of the async log pipeline (per worker)
+@router.get("/pipeline/stats")
+async def log_pipeline_stats():
+    return {
+        "message": "Log pipeline statistics retrieved successfully",
+        "result": True,
+        "data": get_log_pipeline_stats()
+    }
+
+def resolve_log_folder(log_type: str) -> Path:
+    if IS_PRODUCTION:
+        if log_type != "":
+            raise HTTPException(status_code=400, detail="Invalid log type")
+        log_folder = BASE_LOG_DIR
+    else:
+        if log_type not in ALLOWED_DIRS:
+            raise HTTPException(status_code=400, detail="Invalid log type")
+        log_folder = (BASE_LOG_DIR / log_type).resolve()
+
+    if not str(log_folder).startswith(str(BASE_LOG_DIR)):
+        raise HTTPException(status_code=400, detail="Invalid path")
+
+    if not log_folder.exists() or not log_folder.is_dir():
+        raise HTTPException(status_code=404, detail="Log folder not found")
+    return log_folder
+
+# Filter ndjson log records through the sidecar index, without loading whole files
+@router.get("/{log_type}/search")
+async def search_log_files(
+    log_type: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[int] = None,
+    channel: Optional[str] = None,
+    ip: Optional[str] = None,
+    url: Optional[str] = None,
+    request_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    log_folder = resolve_log_folder(log_type)
+    query = LogQuery(start, end, status, channel, ip, url, request_id, limit)
+    try:
+        records = await asyncio.to_thread(search_logs, log_folder, query)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching logs: {str(e)}")
+    return {
+        "message": "Log records retrieved successfully",
+        "result": True,
+        "data": records
+    }
+
 @router.get("/{log_type}/{filename}", response_class=PlainTextResponse)
-async def read_log_file(log_type: str, filename: str):
+async def read_log_file(
+    request: Request,
+    log_type: str,
+    filename: str,
+    offset: Optional[int] = Query(None, ge=0, description="First line to return"),
+    limit: Optional[int] = Query(None, ge=1, description="Number of lines to return"),
+    tail: Optional[int] = Query(None, ge=1, le=10000, description="Return only the last N lines"),
+    follow: bool = Query(False, description="Keep streaming new lines as server-sent events"),
+):
     if IS_PRODUCTION:
         if log_type != "":
             raise HTTPException(status_code=400, detail="Invalid log type")
@@ -39,47 +104,48 @@ async def read_log_file(log_type: str, filename: str):
     if not log_path.exists() or not log_path.is_file():
         raise HTTPException(status_code=404, detail="Log file not found")
 
+    # Never load the whole file: stream it, or read only the requested window
     try:
-        return log_path.read_text(encoding="utf-8")
+        if follow:
+            return StreamingResponse(
+                follow_log(request, log_path, tail or 0),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+        if tail:
+            lines = await asyncio.to_thread(read_tail, log_path, tail)
+            return PlainTextResponse(b"".join(lines))
+        if offset is not None or limit is not None:
+            return StreamingResponse(iter_line_window(log_path, offset or 0, limit), media_type="text/plain; charset=utf-8")
+        # FileResponse streams in chunks and honours Range headers
+        return FileResponse(log_path, media_type="text/plain; charset=utf-8")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading file: {str(e)}")
 
 
 @router.get("/{log_type}", response_model=LogFilesResponse)
-async def list_log_files(log_type: str):
-    if IS_PRODUCTION:
-        if log_type != "":
-            raise HTTPException(status_code=400, detail="Invalid log type")
-        log_folder = BASE_LOG_DIR
-        
-    else:
-        if log_type not in ALLOWED_DIRS:
-            raise HTTPException(status_code=400, detail="Invalid log type")
-        log_folder = (BASE_LOG_DIR / log_type).resolve()
-        print("getting log folder location", log_folder)
-
-    if not str(log_folder).startswith(str(BASE_LOG_DIR)):
-        raise HTTPException(status_code=400, detail="Invalid path")
-
-    if not log_folder.exists() or not log_folder.is_dir():
-        raise HTTPException(status_code=404, detail="Log folder not found")
-
-    log_files = []
-    for f in log_folder.glob("*.log"):
-        if f.is_file():
-            stat = f.stat()
-            log_files.append({
-                "filename": f.name,
-                "size": stat.st_size,
-                "created_at": datetime.fromtimestamp(stat.st_ctime)
-            })
-
-    log_files.sort(key=lambda x: x["created_at"], reverse=True)
+async def list_log_files(
+    log_type: str,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    sort: str = Query("created_at", pattern="^(created_at|size|filename)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+):
+    log_folder = resolve_log_folder(log_type)
+    print("getting log folder location", log_folder)
+
+    # Served from the in-memory manifest instead of globbing and stat'ing every file
+    total, log_files = await asyncio.to_thread(
+        log_manifest.page, str(log_folder), page, page_size, sort, order == "desc"
+    )
 
     return {
         "message": "Logs retrieved successfully",
         "result": True,
-        "data": log_files
+        "data": log_files,
+        "total": total,
+        "page": page,
+        "page_size": page_size
     }
 
 @router.delete("/{log_type}/{filename}")
@@ -100,6 +166,7 @@ async def delete_log_file(log_type: str, filename: str):
     print("deleteing files from api")
     try:
         log_path.unlink()  # or os.remove(log_path)
+        log_manifest.remove(str(log_path))
         return JSONResponse(
             status_code=200,
             content={"result": True, "message": "Log file deleted successfully"}
@@ -0,0 +1,103 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+import pytz
+
+paris_tz = pytz.timezone('Europe/Paris')
+
+
+class LogQuery:
+    def __init__(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                 status: Optional[int] = None, channel: Optional[str] = None, ip: Optional[str] = None,
+                 url: Optional[str] = None, request_id: Optional[str] = None, limit: int = 100):
+        # Naive datetimes are taken as Paris time, like the log timestamps
+        self.start = _aware(start)
+        self.end = _aware(end)
+        self.status = status
+        self.channel = channel
+        self.ip = ip
+        self.url = url
+        self.request_id = request_id
+        self.limit = limit
+
+    def block_may_match(self, block: dict) -> bool:
+        """Decide from the sidecar index alone whether a block can hold a match."""
+        if self.start and block.get("ts_max", 0) < self.start.timestamp():
+            return False
+        if self.end and block.get("ts_min", 0) > self.end.timestamp():
+            return False
+        if self.status is not None and self.status not in block.get("status", []):
+            return False
+        if self.channel and self.channel not in block.get("channel", []):
+            return False
+        if self.ip and self.ip not in block.get("ip", []):
+            return False
+        if self.request_id and self.request_id not in block.get("rid", []):
+            return False
+        return True
+
+    def matches(self, entry: dict) -> bool:
+        if self.start or self.end:
+            try:
+                ts = datetime.fromisoformat(entry["ts"])
+            except (KeyError, ValueError):
+                return False
+            if self.start and ts < self.start:
+                return False
+            if self.end and ts > self.end:
+                return False
+        if self.status is not None and entry.get("status_code") != self.status:
+            return False
+        if self.channel and entry.get("channel") != self.channel:
+            return False
+        if self.ip and entry.get("client_ip") != self.ip:
+            return False
+        if self.request_id and entry.get("request_id") != self.request_id:
+            return False
+        if self.url and self.url not in (entry.get("url") or ""):
+            return False
+        return True
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return paris_tz.localize(value)
+    return value
+
+
+def _read_index(index_path: Path) -> Iterator[dict]:
+    with index_path.open("r", encoding="utf-8") as index_file:
+        for line in index_file:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def search_logs(folder: Path, query: LogQuery) -> List[dict]:
+    """Find matching ndjson records using the ``.idx`` sidecars; only candidate byte ranges are read."""
+    results: List[dict] = []
+    index_files = sorted(folder.glob("*.idx"), key=lambda f: f.stat().st_mtime, reverse=True)
+    for index_path in index_files:
+        log_path = index_path.with_name(index_path.name[:-len(".idx")])
+        if not log_path.is_file():
+            continue
+        blocks = [block for block in _read_index(index_path) if query.block_may_match(block)]
+        if not blocks:
+            continue
+        with log_path.open("rb") as log_file:
+            for block in reversed(blocks):
+                log_file.seek(block["start"])
+                chunk = log_file.read(block["end"] - block["start"])
+                for line in reversed(chunk.splitlines()):
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if query.matches(entry):
+                        entry["file"] = log_path.name
+                        results.append(entry)
+                        if len(results) >= query.limit:
+                            return results
+    return results
@@ -6,32 +6,38 @@ from fastapi.responses import FileResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 import httpx
 from redis import Redis
+from auth.blocklist_cache import BLOCKLIST_CHANNEL, apply_blocklist_delta
 from auth.blocklist_updater import refresh_blocklist_periodically
 from auth.dependencies import authenticate_user, get_db, get_user_role, validate_token
-from auth.domain_blocker import DomainBlockMiddleware
-from auth.ip_blocker import IPBlockMiddleware
+from auth.asgi_middleware import GatewayGateMiddleware
 from auth.middleware import ApiGateway_Middleware
+from auth.principal_cache import PRINCIPAL_CHANNEL, principal_cache
 from auth.routes import router as auth_router
 from sqlalchemy.orm import Session
-from auth.database import engine
+from auth.database import async_engine, engine
 from auth.static_seeder import seed_api_routes, seed_channels, seed_roles, seed_users
 from auth.utils import SUPERLOGIN_ACCESS_TOKEN_EXPIRE_MINUTES, UserLogged_access_token
 from logger import log_error, log_info
 from users.routes import router as users_router
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
-from DLL.API_routes import router as api_router
+from DLL.API_routes import rate_limiter, redis_client as api_redis_client, router as api_router
+from DLL.cache_routes import router as api_cache
+from DLL.cache_warmer import cache_warmer
+from DLL.config_snapshot import CONFIG_CHANNEL, config_store
+from DLL.hot_keys import hot_keys
+from DLL.http_clients import upstream_clients
+from DLL.local_cache import CACHE_CHANNEL, local_cache
+from DLL.pubsub import event_bus
+from DLL.utils import HybridRateLimiter
 from DLL.channel_routes import router as api_channels
 from DLL.urls_routes import router as api_urls
 from logs.routes import router as log_router
 
 app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
 ApiGateway_Middleware(app)
-# IP blocker middleware
-app.add_middleware(IPBlockMiddleware)
-
-# Domain blocker middleware (after IP so it checks second)
-app.add_middleware(DomainBlockMiddleware)
+# IP and domain blocker, outermost so blocked clients are rejected before anything else runs
+app.add_middleware(GatewayGateMiddleware)
 
 templates = Jinja2Templates(directory="users/templates")
 #app.mount("/static/logs", StaticFiles(directory="users/static"), name="logs")
@@ -50,18 +56,35 @@ async def startup_event():
     global redis_client
     redis_url = os.getenv("REDIS_URL")
     redis_client = Redis.from_url(redis_url, decode_responses=True)
-    asyncio.create_task(refresh_blocklist_periodically(interval=60))
+    asyncio.create_task(refresh_blocklist_periodically(interval=600))
+    await config_store.startup()
+    await upstream_clients.startup(config_store.current.channels.values())
+    event_bus.subscribe(CONFIG_CHANNEL, config_store.on_change)
+    event_bus.subscribe(PRINCIPAL_CHANNEL, principal_cache.on_change)
+    event_bus.subscribe(BLOCKLIST_CHANNEL, apply_blocklist_delta)
+    event_bus.subscribe(CACHE_CHANNEL, local_cache.on_change)
+    await event_bus.start()
+    asyncio.create_task(config_store.refresh_periodically())
+    asyncio.create_task(hot_keys.flush_periodically(api_redis_client))
+    if os.getenv("CACHE_WARM", "on").lower() != "off":
+        asyncio.create_task(cache_warmer.run_periodically())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     if redis_client:
         redis_client.close()
+    if isinstance(rate_limiter, HybridRateLimiter):
+        await rate_limiter.release_all()
+    await upstream_clients.aclose()
+    await event_bus.stop()
+    await async_engine.dispose()
 
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(users_router, prefix="/user", tags=["user"])
 app.include_router(log_router, prefix="/logs", tags=["Logs files"])
 app.include_router(api_channels, prefix="/channels", tags=["channels"])
 app.include_router(api_urls, prefix="/routeurls", tags=["Route urls"])
+app.include_router(api_cache, prefix="/cache", tags=["cache"])
 app.include_router(api_router, prefix="/{channel}", tags=["api Urls"])
 
 @app.get("/")
@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+# The app modules read these at import time: a throwaway SQLite file stands in for
+# Postgres, Redis is never reached (tests use fakeredis), logs go under /tmp.
+_db_dir = tempfile.mkdtemp(prefix="gateway-tests-")
+os.environ.setdefault("DB_CONNECTIVITY", f"sqlite:///{os.path.join(_db_dir, 'gateway.db')}")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/15")
+os.environ.setdefault("IS_PRODUCTION", "true")
+
+import fakeredis
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def redis_client():
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+async def binary_redis_client():
+    client = fakeredis.FakeAsyncRedis()
+    yield client
+    await client.aclose()
@@ -0,0 +1,60 @@
+import gzip
+import os
+
+import pytest
+
+from DLL import cache_codec
+from DLL.cache_codec import accepts_encoding, compress, decompress, resolve_codec
+
+JSON_BODY = b'{"clients": [' + b",".join(b'{"id": %d, "name": "client"}' % i for i in range(200)) + b"]}"
+
+
+def test_resolve_codec_prefers_route_setting():
+    assert resolve_codec("gzip") == "gzip"
+    assert resolve_codec("none") is None
+    assert resolve_codec("GZIP") == "gzip"
+
+
+def test_resolve_codec_falls_back_to_gzip_without_zstandard(monkeypatch):
+    monkeypatch.setattr(cache_codec, "zstandard", None)
+    assert resolve_codec("zstd") == "gzip"
+
+
+def test_gzip_round_trip():
+    stored, encoding = compress(JSON_BODY, "gzip")
+    assert encoding == "gzip"
+    assert len(stored) < len(JSON_BODY)
+    assert gzip.decompress(stored) == JSON_BODY
+    assert decompress(stored, encoding) == JSON_BODY
+
+
+def test_zstd_round_trip():
+    pytest.importorskip("zstandard")
+    stored, encoding = compress(JSON_BODY, "zstd")
+    assert encoding == "zstd"
+    assert decompress(stored, encoding) == JSON_BODY
+
+
+def test_small_and_incompressible_bodies_are_stored_as_is():
+    assert compress(b'{"id": 1}', "gzip") == (b'{"id": 1}', None)
+    noise = os.urandom(4096)
+    assert compress(noise, "gzip") == (noise, None)
+    assert compress(JSON_BODY, None) == (JSON_BODY, None)
+    assert decompress(b"raw", None) == b"raw"
+
+
+@pytest.mark.parametrize("header, encoding, expected", [
+    ("gzip, deflate, br", "gzip", True),
+    ("GZIP", "gzip", True),
+    ("br;q=1.0, gzip;q=0", "gzip", False),
+    ("gzip;q=0.5", "gzip", True),
+    ("*", "zstd", True),
+    ("*;q=0", "gzip", False),
+    ("gzip;q=0, *", "gzip", False),
+    ("deflate", "gzip", False),
+    ("gzip;q=abc", "gzip", False),
+    ("", "gzip", False),
+    (None, "gzip", False),
+])
+def test_accepts_encoding(header, encoding, expected):
+    assert accepts_encoding(header, encoding) is expected
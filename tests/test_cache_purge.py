@@ -0,0 +1,125 @@
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from auth.middleware import admin_only
+from DLL import cache_routes
+from DLL.config_snapshot import ConfigSnapshot, config_store
+from DLL.response_cache import (
+    ResponseCache, cache_indexes, cache_key, channel_index, path_index, prefix_index, split_cache_key,
+)
+
+pytestmark = pytest.mark.anyio
+
+ROUTES = [
+    {"path": "/clients", "maxcache": 60},
+    {"path": "/clients/{client_id}", "maxcache": 60},
+    {"path": "/clients/{client_id}/products", "maxcache": 60, "cache_key_prefix": "catalog"},
+]
+CHANNELS = [{"name": "shop", "BaseUrl": "http://core"}, {"name": "b2b", "BaseUrl": "http://core"}]
+
+
+async def store(cache: ResponseCache, channel: str, prefix, path: str, ttl: int = 60):
+    key = cache_key(channel, prefix, path)
+    await cache.set(key, b'{"id": 1}', "application/json", ttl, indexes=cache_indexes(channel, prefix, path))
+    return key
+
+
+@pytest.fixture
+async def cache(binary_redis_client):
+    cache = ResponseCache(binary_redis_client)
+    for channel in ("shop", "b2b"):
+        await store(cache, channel, None, "/clients")
+        await store(cache, channel, None, "/clients/42")
+        await store(cache, channel, "catalog", "/clients/42/products")
+        await store(cache, channel, "catalog", "/clients/7/products")
+    return cache
+
+
+def test_key_and_index_layout():
+    key = cache_key("shop", None, "/clients/42/products")
+    assert key == "cache:shop:default:/clients/42/products"
+    assert split_cache_key(key) == ("shop", "default", "/clients/42/products")
+    assert cache_indexes("shop", None, "/clients/42/products") == [
+        channel_index("shop"), prefix_index("default"), prefix_index("default", "shop"),
+        path_index("shop", "/clients"), path_index("shop", "/clients/42"),
+    ]
+
+
+async def test_indexes_track_channel_prefix_and_ancestors(cache):
+    assert len(await cache.indexed_keys([channel_index("shop")])) == 4
+    assert len(await cache.indexed_keys([prefix_index("catalog")])) == 4
+    assert await cache.indexed_keys([prefix_index("catalog", "b2b")]) == [
+        "cache:b2b:catalog:/clients/42/products", "cache:b2b:catalog:/clients/7/products",
+    ]
+    # Strictly below the path
+    assert await cache.indexed_keys([path_index("shop", "/clients/42")]) == ["cache:shop:catalog:/clients/42/products"]
+    assert len(await cache.indexed_keys([path_index("shop", "/clients")])) == 3
+
+
+async def test_index_scores_follow_key_expiry(cache, binary_redis_client):
+    key = await store(cache, "shop", None, "/clients/9", ttl=30)
+    score = await binary_redis_client.zscore(channel_index("shop"), key)
+    assert time.time() + 25 < score <= time.time() + 30
+    assert 0 < await binary_redis_client.ttl(channel_index("shop"))
+
+
+async def test_expired_members_are_hidden_and_pruned_on_write(cache, binary_redis_client):
+    gone = "cache:shop:default:/clients/1"
+    await binary_redis_client.zadd(channel_index("shop"), {gone: time.time() - 5})
+    assert gone not in await cache.indexed_keys([channel_index("shop")])
+
+    await store(cache, "shop", None, "/clients/2")
+    assert await binary_redis_client.zscore(channel_index("shop"), gone) is None
+
+
+async def test_purge_removes_keys_and_index_members(cache, binary_redis_client):
+    keys = await cache.indexed_keys([path_index("shop", "/clients/42")])
+    assert await cache.purge(keys) == 1
+
+    assert not await binary_redis_client.exists(keys[0])
+    for index in cache_indexes(*split_cache_key(keys[0])):
+        assert await binary_redis_client.zscore(index, keys[0]) is None
+    assert len(await cache.indexed_keys([channel_index("shop")])) == 3
+    assert len(await cache.indexed_keys([channel_index("b2b")])) == 4
+    # Already gone: nothing left to delete
+    assert await cache.purge(keys) == 0
+
+
+@pytest.fixture
+async def client(cache, monkeypatch):
+    monkeypatch.setattr(cache_routes, "response_cache", cache)
+    monkeypatch.setattr(config_store, "_snapshot", ConfigSnapshot(1, CHANNELS, ROUTES))
+    app = FastAPI()
+    app.include_router(cache_routes.router, prefix="/cache")
+    app.dependency_overrides[admin_only] = lambda: True
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://gateway") as client:
+        yield client
+
+
+@pytest.mark.parametrize("purge, purged, remaining_shop", [
+    ({"channel": "shop", "path": "/clients/42/*"}, 1, 3),
+    ({"channel": "shop", "path": "/clients/{client_id}/products"}, 2, 2),
+    ({"channel": "shop", "path": "/clients/42"}, 1, 3),
+    ({"channel": "shop", "cache_key_prefix": "catalog"}, 2, 2),
+    ({"channel": "shop"}, 4, 0),
+])
+async def test_purge_endpoint(client, cache, purge, purged, remaining_shop):
+    response = await client.post("/cache/purge", json=purge)
+    assert response.status_code == 200
+    assert response.json()["data"]["purged"] == purged
+    assert len(await cache.indexed_keys([channel_index("shop")])) == remaining_shop
+    assert len(await cache.indexed_keys([channel_index("b2b")])) == 4
+
+
+async def test_purge_across_channels_by_prefix(client, cache):
+    response = await client.post("/cache/purge", json={"cache_key_prefix": "catalog"})
+    assert response.json()["data"]["purged"] == 4
+    assert await cache.indexed_keys([prefix_index("catalog")]) == []
+
+
+async def test_purge_endpoint_validation(client):
+    assert (await client.post("/cache/purge", json={})).status_code == 400
+    assert (await client.post("/cache/purge", json={"channel": "nope"})).status_code == 404
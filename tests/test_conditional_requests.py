@@ -0,0 +1,95 @@
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request, Response
+
+from DLL.API_routes import _etag_matches, cached_response
+from DLL.cache_codec import compress
+from DLL.response_cache import CacheEntry
+
+pytestmark = pytest.mark.anyio
+
+BODY = b'{"data": [' + b",".join(b'{"id": %d}' % i for i in range(300)) + b"]}"
+LAST_MODIFIED = "Wed, 21 Oct 2026 07:28:00 GMT"
+
+
+@pytest.mark.parametrize("if_none_match, etag, expected", [
+    ('"abc"', '"abc"', True),
+    ('W/"abc"', '"abc"', True),
+    ('"abc"', 'W/"abc"', True),
+    ('"x", "abc"', '"abc"', True),
+    ("*", '"abc"', True),
+    ('"abd"', '"abc"', False),
+    ('"abc-gzip"', '"abc"', False),
+])
+def test_etag_matches_weakly(if_none_match, etag, expected):
+    assert _etag_matches(if_none_match, etag) is expected
+
+
+def make_app(entry: CacheEntry) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/clients")
+    async def clients(request: Request, response: Response):
+        response.headers["X-RateLimit-Remaining"] = "9"
+        return cached_response(request, response, entry, "HIT")
+
+    return app
+
+
+async def get(entry: CacheEntry, **headers) -> httpx.Response:
+    transport = httpx.ASGITransport(app=make_app(entry))
+    async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+        return await client.get("/clients", headers=headers)
+
+
+def plain_entry(**kwargs) -> CacheEntry:
+    now = time.time()
+    return CacheEntry(BODY, "application/json", now, now + 60, "d1g3st", **kwargs)
+
+
+async def test_digest_etag_and_not_modified():
+    response = await get(plain_entry())
+    assert response.status_code == 200
+    assert response.content == BODY
+    assert response.headers["etag"] == 'W/"d1g3st"'
+    assert response.headers["x-cache"] == "HIT"
+    assert response.headers["x-ratelimit-remaining"] == "9"
+
+    not_modified = await get(plain_entry(), **{"If-None-Match": 'W/"d1g3st"'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["x-ratelimit-remaining"] == "9"
+
+
+async def test_upstream_validators_are_replayed():
+    entry = plain_entry(etag='"v2"', last_modified=LAST_MODIFIED)
+    response = await get(entry)
+    assert response.headers["etag"] == '"v2"'
+    assert response.headers["last-modified"] == LAST_MODIFIED
+
+    assert (await get(entry, **{"If-None-Match": '"v1"'})).status_code == 200
+    assert (await get(entry, **{"If-Modified-Since": LAST_MODIFIED})).status_code == 304
+    assert (await get(entry, **{"If-Modified-Since": "Tue, 20 Oct 2026 07:28:00 GMT"})).status_code == 200
+    # If-None-Match takes precedence over If-Modified-Since
+    assert (await get(entry, **{"If-None-Match": '"v1"', "If-Modified-Since": LAST_MODIFIED})).status_code == 200
+
+
+async def test_compressed_entry_is_sent_compressed_under_a_weak_etag():
+    stored, encoding = compress(BODY, "gzip")
+    now = time.time()
+    entry = CacheEntry(stored, "application/json", now, now + 60, "d1g3st", etag='"v2"', encoding=encoding)
+
+    transport = httpx.ASGITransport(app=make_app(entry))
+    async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+        response = await client.get("/clients", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == 'W/"v2"'
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == BODY
+
+        identity = await client.get("/clients", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers
+        assert identity.headers["etag"] == '"v2"'
+        assert identity.content == BODY
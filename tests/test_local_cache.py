@@ -0,0 +1,86 @@
+import time
+
+from DLL.local_cache import ENTRY_OVERHEAD, WORKER_ID, FrequencySketch, LocalCache
+
+ENTRY_SIZE = 100
+
+
+def make_cache(entries: int = 3) -> LocalCache:
+    return LocalCache(max_bytes=entries * (ENTRY_SIZE + ENTRY_OVERHEAD), max_entry_ratio=1.0)
+
+
+def request(cache: LocalCache, key: str, times: int = 1):
+    # Every lookup feeds the frequency sketch, like a request missing L1 would
+    for _ in range(times):
+        cache.get(key)
+
+
+def fill(cache: LocalCache, keys, times: int = 2):
+    expires_at = time.time() + 60
+    for key in keys:
+        request(cache, key, times)
+        assert cache.put(key, key.upper(), ENTRY_SIZE, expires_at)
+
+
+def test_sketch_counts_and_ages():
+    sketch = FrequencySketch(width=64, sample_size=20)
+    for _ in range(10):
+        sketch.add("hot")
+    assert sketch.estimate("hot") == 10
+    assert sketch.estimate("cold") == 0
+    for _ in range(10):
+        sketch.add("other")
+    # The 20th addition halves every counter
+    assert sketch.estimate("hot") == 5
+
+
+def test_one_off_key_does_not_evict_popular_entries():
+    cache = make_cache()
+    fill(cache, ["a", "b", "c"])
+    request(cache, "once")
+    assert not cache.put("once", "ONCE", ENTRY_SIZE, time.time() + 60)
+    assert cache.rejected == 1
+    assert [cache.get(key) for key in ("a", "b", "c")] == ["A", "B", "C"]
+
+
+def test_frequent_newcomer_evicts_least_recently_used():
+    cache = make_cache()
+    fill(cache, ["a", "b", "c"])
+    cache.get("b")
+    cache.get("c")
+    request(cache, "d", times=5)
+    assert cache.put("d", "D", ENTRY_SIZE, time.time() + 60)
+    assert cache.evictions == 1
+    assert cache.get("a") is None
+    assert cache.get("d") == "D"
+
+
+def test_expired_victim_is_always_evicted():
+    cache = make_cache(entries=1)
+    request(cache, "old", times=5)
+    cache.put("old", "OLD", ENTRY_SIZE, time.time() + 60)
+    cache._entries["old"] = ("OLD", ENTRY_SIZE + ENTRY_OVERHEAD, time.time() - 1)
+    assert cache.put("new", "NEW", ENTRY_SIZE, time.time() + 60)
+    assert cache.get("new") == "NEW"
+
+
+def test_entries_expire_and_respect_max_ttl():
+    cache = make_cache()
+    assert not cache.put("past", "X", ENTRY_SIZE, time.time() - 1)
+    assert not cache.put("capped", "X", ENTRY_SIZE, time.time() + 60, max_ttl=0)
+    assert not cache.put("huge", "X", 10 * ENTRY_SIZE, time.time() + 60)
+    cache.put("soon", "X", ENTRY_SIZE, time.time() + 60, max_ttl=1)
+    assert cache._entries["soon"][2] <= time.time() + 1
+
+
+def test_invalidation_messages():
+    cache = make_cache()
+    fill(cache, ["a", "b"])
+    cache.on_change({"keys": ["a"], "origin": WORKER_ID})
+    assert cache.get("a") == "A"
+    cache.on_change({"keys": ["a"], "origin": "another-worker"})
+    assert cache.get("a") is None
+    assert cache.get("b") == "B"
+    cache.on_change({"keys": None, "origin": "another-worker"})
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
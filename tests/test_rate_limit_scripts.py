@@ -0,0 +1,95 @@
+import fakeredis
+import pytest
+
+from DLL.utils import HybridRateLimiter, RateLimitConfig, RateLimiter
+
+pytestmark = pytest.mark.anyio
+
+ALGORITHMS = ["sliding_window", "token_bucket"]
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+async def test_allows_up_to_the_limit_then_denies(redis_client, algorithm):
+    quota = RateLimitConfig(3, 60, algorithm)
+    limiter = RateLimiter(redis_client, quota)
+    results = [await limiter.hit([("rate_limit:user:/clients", quota)]) for _ in range(4)]
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert [result.remaining for result in results] == [2, 1, 0, 0]
+    denied = results[-1]
+    assert 0 < denied.retry_after <= 60
+    headers = denied.headers()
+    assert headers["X-RateLimit-Limit"] == "3"
+    assert headers["X-RateLimit-Remaining"] == "0"
+    assert 1 <= int(headers["Retry-After"]) <= 60
+    assert "Retry-After" not in results[0].headers()
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+async def test_denied_requests_are_not_counted_against_other_quotas(redis_client, algorithm):
+    tight = RateLimitConfig(1, 60, algorithm)
+    loose = RateLimitConfig(10, 60, algorithm)
+    limiter = RateLimiter(redis_client, loose)
+    quotas = [("rate_limit:user:shop", loose), ("rate_limit:route:/clients", tight)]
+
+    first = await limiter.hit(quotas)
+    assert first.allowed
+    # The tightest quota is the one reported
+    assert first.limit == 1
+    for _ in range(3):
+        assert not (await limiter.hit(quotas)).allowed
+
+    after_denials = await limiter.hit([("rate_limit:user:shop", loose)])
+    assert after_denials.allowed
+    assert after_denials.remaining == 8
+
+
+async def test_sliding_window_keeps_one_member_per_request(redis_client):
+    quota = RateLimitConfig(5, 60)
+    limiter = RateLimiter(redis_client, quota)
+    for _ in range(7):
+        await limiter.hit([("rate_limit:window", quota)])
+    assert await redis_client.zcard("rate_limit:window") == 5
+    assert 0 < await redis_client.pttl("rate_limit:window") <= 60_000
+
+
+async def test_token_bucket_cost(redis_client):
+    quota = RateLimitConfig(10, 60, "token_bucket")
+    limiter = RateLimiter(redis_client, quota)
+    assert (await limiter.hit([("rate_limit:bucket", quota)], cost=8)).remaining == 2
+    assert not (await limiter.hit([("rate_limit:bucket", quota)], cost=3)).allowed
+    assert (await limiter.hit([("rate_limit:bucket", quota)], cost=2)).allowed
+
+
+async def test_fails_open_without_redis():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    quota = RateLimitConfig(1, 60)
+    assert await RateLimiter(client, quota).hit([("rate_limit:down", quota)]) is None
+
+
+async def test_hybrid_leases_batches_and_returns_unused_tokens(redis_client):
+    quota = RateLimitConfig(100, 60, "token_bucket")
+    limiter = HybridRateLimiter(redis_client, quota, lease_fraction=0.1)
+    key = "rate_limit:user:shop"
+
+    for _ in range(10):
+        assert (await limiter.hit([(key, quota)])).allowed
+    # One lease of 10 tokens served all ten requests
+    tat_after_lease = float(await redis_client.get(key))
+    assert (await limiter.hit([(key, quota)])).allowed
+    assert float(await redis_client.get(key)) > tat_after_lease
+
+    await limiter.release_all()
+    check = await RateLimiter(redis_client, quota).hit([(key, quota)])
+    # 11 spent, 9 of the second lease handed back, this check spends 1
+    assert check.remaining in (88, 89)
+
+
+async def test_hybrid_denies_once_the_quota_is_leased_out(redis_client):
+    quota = RateLimitConfig(4, 60, "token_bucket")
+    limiter = HybridRateLimiter(redis_client, quota, lease_fraction=0.5)
+    results = [await limiter.hit([("rate_limit:small", quota)]) for _ in range(5)]
+    assert [result.allowed for result in results] == [True, True, True, True, False]
+    assert results[-1].retry_after > 0
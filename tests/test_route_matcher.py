@@ -0,0 +1,59 @@
+from DLL.route_matcher import RouteMatcher
+
+ROUTES = [
+    {"path": "/clients", "maxcache": 60},
+    {"path": "/clients/{client_id}", "maxcache": 30, "cache_key_prefix": "client"},
+    {"path": "/clients/{client_id}/products", "maxcache": 30, "stale_ttl": 120},
+    {"path": "/clients/{client_id}/orders/{order_id}", "maxcache": 10},
+    {"path": "/clients/{client_id}/orders/invoice/{invoice_id}", "maxcache": 10},
+    {"path": "/clients/special/orders", "maxcache": 5},
+]
+
+
+def test_static_route():
+    matched = RouteMatcher(ROUTES).match("/clients")
+    assert matched.path == "/clients"
+    assert matched.params == {}
+    assert matched.maxcache == 60
+
+
+def test_params_are_extracted_in_order():
+    matched = RouteMatcher(ROUTES).match("/clients/42/orders/7")
+    assert matched.path == "/clients/{client_id}/orders/{order_id}"
+    assert matched.params == {"client_id": "42", "order_id": "7"}
+
+
+def test_static_segment_wins_over_wildcard():
+    matched = RouteMatcher(ROUTES).match("/clients/42/orders/invoice/9")
+    assert matched.path == "/clients/{client_id}/orders/invoice/{invoice_id}"
+    assert matched.params == {"client_id": "42", "invoice_id": "9"}
+
+
+def test_falls_back_to_wildcard_when_static_branch_dead_ends():
+    # "special" has a static child, but only "orders" below it
+    matched = RouteMatcher(ROUTES).match("/clients/special/products")
+    assert matched.path == "/clients/{client_id}/products"
+    assert matched.params == {"client_id": "special"}
+
+
+def test_unknown_paths_and_trailing_slash_do_not_match():
+    matcher = RouteMatcher(ROUTES)
+    assert matcher.match("/clients/42/unknown") is None
+    assert matcher.match("/clients/") is None
+    assert matcher.match("/clients//products") is None
+
+
+def test_route_settings_are_exposed_with_defaults():
+    matcher = RouteMatcher(ROUTES)
+    assert matcher.match("/clients/1").cache_key_prefix == "client"
+    products = matcher.match("/clients/1/products")
+    assert products.stale_ttl == 120
+    assert products.stale_if_error_ttl == 0
+    assert products.cache_codec is None
+
+
+def test_size_counts_distinct_templates():
+    matcher = RouteMatcher(ROUTES)
+    matcher.add({"path": "/clients", "maxcache": 5})
+    assert matcher.size == len(ROUTES)
+    assert matcher.match("/clients").maxcache == 5
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, Enum, Text, func
+from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, String, DateTime, Enum, Text, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -55,6 +55,14 @@ class Channel(Base):
     base_url = Column(String, nullable=True)  # Add base_url column
     auth_url = Column(String, nullable=True)  # Add auth_url column
     api_key = Column(String, unique=True, nullable=True)   # Add api_key column
+    http2 = Column(Boolean, default=False, nullable=False)
+    max_connections = Column(Integer, nullable=True)  # Upstream pool limits, defaults when empty
+    max_keepalive_connections = Column(Integer, nullable=True)
+    keepalive_expiry = Column(Float, nullable=True)  # Seconds
+    connect_timeout = Column(Float, nullable=True)  # Seconds
+    read_timeout = Column(Float, nullable=True)  # Seconds
+    rate_limit_calls = Column(Integer, nullable=True)  # Per user on this channel, defaults when empty
+    rate_limit_period = Column(Integer, nullable=True)  # Seconds
     status = Column(Enum(StatusEnum), default=StatusEnum.active, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, onupdate=func.now())
@@ -112,6 +120,11 @@ class APIRoute(Base):
     path = Column(String(255), nullable=False) 
     cache_key_prefix = Column(String(50), nullable=False)
     maxcache = Column(Integer, nullable=False)
+    stale_ttl = Column(Integer, nullable=True)  # Seconds served stale while refreshing in the background
+    stale_if_error_ttl = Column(Integer, nullable=True)  # Seconds served stale when the core API fails
+    cache_codec = Column(String(10), nullable=True)  # zstd, gzip or none; CACHE_CODEC when empty
+    rate_limit_calls = Column(Integer, nullable=True)  # Per user on this route, no route quota when empty
+    rate_limit_period = Column(Integer, nullable=True)  # Seconds
     description = Column(Text, nullable=True)  # Optional field
     status = Column(Enum(StatusEnum), default=StatusEnum.active, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
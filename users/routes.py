@@ -5,6 +5,7 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.orm import Session
 from DLL.schemas import ShowRoleResponse, ShowUsersResponse, UserCreation, UserUpdate
 from auth.dependencies import  get_current_user, get_db, get_user
+from auth.principal_cache import invalidate_principal
 from auth.utils import get_password_hash
 from logger import log_error, log_info
 from .schemas import UserSchema
@@ -136,6 +137,7 @@ def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_d
                 db.add(UserChannel(user_id=user_id, channel_id=channel_id))
             db.commit()
 
+        invalidate_principal(user_id)
         return {"message": "User updated successfully"}
 
     except SQLAlchemyError as e:
@@ -160,6 +162,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
         # Step 3: Delete user
         db.delete(user)
         db.commit()
+        invalidate_principal(user_id)
 
         return {"message": f"User with ID {user_id} deleted successfully"}
 